@@ -1,61 +1,151 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 import json
-import chromadb
-from sentence_transformers import SentenceTransformer
-from openai import OpenAI
 import traceback
 import re
 import os
 from dotenv import load_dotenv
+from lazy import LazyResource, warm_up
+from catalog import load_catalog, CatalogReloader
+from catalog_terms import CHROMA_DIR, DEFAULT_SEMANTIC_CANDIDATES, normalize_number
+from shard_router import ShardRouter
+from adaptive_topk import select_hits, CrossEncoderReranker, NO_CONFIDENT_MATCH
+from admission import AdmissionController, AdmissionRejected, predict_lane, lane_for_branch
+from single_flight import SingleFlight, coalesce_key
+from classification import classify, ClassificationStats
 
-# Initialize DeepSeek client
 load_dotenv()
-deepseek_client = OpenAI(
-    api_key=os.getenv("DEEPSEEK_API_KEY"),
-    base_url=os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com/v1")
-)
+
+# LAZY_IMPORTS=1 defers openai, chromadb and the data files until the first request
+# that needs them; otherwise everything is loaded at import as before.
+LAZY_IMPORTS = os.getenv("LAZY_IMPORTS", "0") == "1"
+
+# Initialize DeepSeek client
+def load_deepseek_client():
+    from openai import OpenAI
+    return OpenAI(
+        api_key=os.getenv("DEEPSEEK_API_KEY"),
+        base_url=os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com/v1")
+    )
+
+deepseek_client = LazyResource("deepseek_client", load_deepseek_client)
 
 app = Flask(__name__)
 
-# Load part_id_map
-with open("part_id_map.json", "r") as f:
-    part_id_map = json.load(f)
+# Only trust X-Forwarded-For when running behind that many known proxies;
+# otherwise any caller could pick their own rate-limit identity
+TRUSTED_PROXY_COUNT = int(os.getenv("TRUSTED_PROXY_COUNT", "0"))
+if TRUSTED_PROXY_COUNT > 0:
+    from werkzeug.middleware.proxy_fix import ProxyFix
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_COUNT)
+
+# Admission control for outstanding LLM calls
+admission = AdmissionController(
+    max_concurrency=int(os.getenv("ADMISSION_MAX_CONCURRENCY", "8")),
+    max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "32")),
+    slo_ms=float(os.getenv("ADMISSION_SLO_MS", "5000")),
+    rate=float(os.getenv("ADMISSION_CLIENT_RATE", "2")),
+    burst=float(os.getenv("ADMISSION_CLIENT_BURST", "10"))
+)
 
-# Load model_to_parts_map
-with open("model_to_parts_map.json", "r") as f:
-    model_to_parts_map = json.load(f)
+# Coalesces identical concurrent /ask requests
+single_flight = SingleFlight()
+
+# Token usage, repair and fallback counts for the classification step
+classification_stats = ClassificationStats()
+
+# Load part_id_map, model_to_parts_map, the parts graph and the facet index as one versioned catalog
+catalog = LazyResource("catalog", load_catalog)
 
 # Init ChromaDB and embedder
-CHROMA_DIR = "./chroma_appliance_parts"
 COLLECTION_NAME = "partselect_parts"
-client = chromadb.PersistentClient(path=CHROMA_DIR)
-collection = client.get_or_create_collection(name=COLLECTION_NAME)
 
-def is_part_compatible_with_model(model_id: str, part_id: str) -> bool:
+def load_shard_router():
+    import chromadb
+    client = chromadb.PersistentClient(path=CHROMA_DIR)
+    return ShardRouter(client, COLLECTION_NAME)
+
+shard_router = LazyResource("shard_router", load_shard_router)
+
+RESOURCES = [deepseek_client, catalog, shard_router]
+if not LAZY_IMPORTS:
+    warm_up(RESOURCES)
+
+# Hot reload: POST /admin/reload, or set CATALOG_WATCH_INTERVAL to poll the catalog files
+reloader = CatalogReloader(catalog, shard_router, load_shard_router)
+reloader.start_watcher(float(os.getenv("CATALOG_WATCH_INTERVAL", "0")))
+
+# Adaptive top-k: over-fetch, cut by calibrated distance and relative gap, optionally rerank.
+# SEMANTIC_MAX_DISTANCE and SEMANTIC_MIN_BAND are the max_distance / min_band columns of
+# reports/retrieval_eval.md for the deployed embedding backend and hnsw:space. Both are off
+# until set, and ignored if the collections use a different space than they were calibrated in.
+SEMANTIC_CANDIDATES = int(os.getenv("SEMANTIC_CANDIDATES", DEFAULT_SEMANTIC_CANDIDATES))
+SEMANTIC_MAX_DISTANCE = float(os.getenv("SEMANTIC_MAX_DISTANCE") or "inf")
+SEMANTIC_MIN_BAND = float(os.getenv("SEMANTIC_MIN_BAND") or "0")
+SEMANTIC_DISTANCE_SPACE = os.getenv("SEMANTIC_DISTANCE_SPACE", "l2")
+SEMANTIC_RELATIVE_GAP = float(os.getenv("SEMANTIC_RELATIVE_GAP", "0.25"))
+reranker = CrossEncoderReranker(os.getenv("SEMANTIC_RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")) \
+    if os.getenv("SEMANTIC_RERANK", "0") == "1" else None
+
+def resolve_part_ids(part_id: str, snapshot=None) -> list:
+    # Old OEM / superseded numbers resolve to the current PartSelect number(s)
+    snapshot = snapshot or catalog()
+    return snapshot.parts_graph.resolve(part_id) or [normalize_number(part_id)]
+
+def is_part_compatible_with_model(model_id: str, part_id: str, snapshot=None) -> bool:
+    snapshot = snapshot or catalog()
     model_id = model_id.strip().lower()
-    part_id = part_id.strip().lower()
-    return model_id in model_to_parts_map and part_id in model_to_parts_map[model_id]
+    compatible_parts = snapshot.model_to_parts_map.get(model_id, ())
+    return any(pid in compatible_parts for pid in resolve_part_ids(part_id, snapshot))
 
-def compatibility_check(part_id: str, model_id: str):
-    compatible = is_part_compatible_with_model(model_id, part_id)
+def compatibility_check(part_id: str, model_id: str, snapshot=None):
+    compatible = is_part_compatible_with_model(model_id, part_id, snapshot)
     return f"Yes, part {part_id} is compatible with model {model_id}." if compatible else f"No, part {part_id} is not compatible with model {model_id}."
 
-def exact_match(part_id: str):
-    meta = part_id_map.get(part_id.lower())
-    if meta:
-        return f"""Part {meta['part_id']} — {meta['title']}
+def exact_match(part_id: str, snapshot=None):
+    snapshot = snapshot or catalog()
+    superseded = snapshot.parts_graph.superseded(part_id)
+    matches = []
+    for pid in resolve_part_ids(part_id, snapshot):
+        meta = snapshot.part_id_map.get(pid)
+        if not meta:
+            continue
+        details = f"""Part {meta['part_id']} — {meta['title']}
                 Brand: {meta['brand']}
                 Description: {meta['description']}
                 Symptoms: {meta['symptoms']}
                 Installation: {meta['installation_difficulty']} in {meta['installation_time']}
                 Video: {meta['video_url']}
                 URL: {meta['url']}"""
-    return "Part not found."
-
-def semantic_lookup(query: str, k=5):
-    results = collection.query(query_texts=[query], n_results=k)
+        if superseded and pid != normalize_number(part_id):
+            details += f"\n                Supersedes: {part_id} has been replaced by {meta['part_id']}"
+        related = snapshot.parts_graph.related(pid)
+        if related:
+            details += f"\n                Related Parts: {', '.join(p.upper() for p in related)}"
+        matches.append(details)
+    return "\n\n".join(matches) if matches else "Part not found."
+
+def semantic_cutoffs(router) -> tuple:
+    # (max_distance, min_band) for select_hits
+    if router.space != SEMANTIC_DISTANCE_SPACE:
+        # Distances from another space aren't comparable to the calibrated values
+        return float("inf"), 0.0
+    return SEMANTIC_MAX_DISTANCE, SEMANTIC_MIN_BAND
+
+def semantic_lookup(query: str, k=5, product_types=None, brand=None, part_ids=None):
+    # part_ids restricts the search to facet candidates; the facet match already vouches
+    # for relevance there, so only the relative cut applies
+    router = shard_router()
+    where = {"part_id": {"$in": part_ids}} if part_ids else None
+    max_distance, min_band = semantic_cutoffs(router)
+    if part_ids:
+        max_distance = float("inf")
+    hits = router.query(query, k=max(k, SEMANTIC_CANDIDATES), product_types=product_types, brand=brand, where=where)
+    hits = select_hits(hits, max_distance, SEMANTIC_RELATIVE_GAP, k=SEMANTIC_CANDIDATES if reranker else k,
+                       min_band=min_band)
+    if reranker:
+        hits = reranker.rerank(query, hits, k)
     parsed = []
-    for entry in results["documents"][0]:
+    for _, entry in hits:
         part = {}
 
         def extract(key, multiline=False):
@@ -77,31 +167,66 @@ def semantic_lookup(query: str, k=5):
         parsed.append(part)
     return parsed
 
-def clean_and_parse_json(raw):
-    try:
-        cleaned = re.sub(r"^```json|```$", "", raw.strip(), flags=re.MULTILINE).strip()
-        return json.loads(cleaned)
-    except Exception as e:
-        raise ValueError(f"Failed to parse DeepSeek JSON output: {e}")
+def facet_candidates(classification: dict, snapshot=None):
+    # Part ids (as stored in Chroma metadata) matching the query's facets, or None
+    snapshot = snapshot or catalog()
+    part_ids = snapshot.facet_index.candidates(
+        symptoms=classification.get("symptoms"),
+        brand=classification.get("brand"),
+        product_types=classification.get("product_types")
+    )
+    if not part_ids:
+        return None
+    return [snapshot.part_id_map.get(pid, {}).get("part_id") or pid.upper() for pid in part_ids]
+
+def facet_lookup(classification: dict, k=5, snapshot=None):
+    # Answers symptom queries from rating-ranked posting lists; None means use vector search
+    snapshot = snapshot or catalog()
+    part_ids = snapshot.facet_index.lookup(
+        symptoms=classification.get("symptoms"),
+        brand=classification.get("brand"),
+        product_types=classification.get("product_types"),
+        k=k
+    )
+    if not part_ids:
+        return None
 
-def generate_final_response(user_query: str, classification: dict, context: any):
-    try:
-        system_prompt = (
-            "You are a helpful, expert customer service agent for appliance parts — "
-            "specifically refrigerators and dishwashers. Your role is to assist users with "
-            "part installation, compatibility, or troubleshooting using only the context provided. "
-            "Avoid guessing. If context is missing, politely say so — but if installation time or difficulty are missing, you may suggest a typical time range like 'usually under 30 minutes' and assume it's easy if not specified.\n\n"
-            "Answer must:\n"
-            "- Be clear, specific, and confident\n"
-            "- Stick to appliance part knowledge\n"
-            "- Include relevant installation difficulty and estimated time if possible\n"
-            "- Return the part's URL if available or else say 'not available'\n"
-            "- Return youtube video from context if available or else say 'not available'\n"
-        )   
-
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"""Query: {user_query}
+    parsed = []
+    for pid in part_ids:
+        meta = snapshot.part_id_map.get(pid)
+        if not meta:
+            continue
+        parsed.append({
+            "title": meta["title"],
+            "description": meta["description"],
+            "symptoms": [s.strip() for s in meta["symptoms"].split("|") if s.strip()],
+            "product_types": [pt.strip().replace(".", "") for pt in meta["product_types"].split(",") if pt.strip()],
+            "part_id": meta["part_id"],
+            "brand": meta["brand"],
+            "installation": f"{meta['installation_difficulty']} in {meta['installation_time']}",
+            "related_parts": [p.upper() for p in snapshot.parts_graph.related(pid)],
+            "replacement_parts": snapshot.parts_graph.replaces(pid),
+            "url": meta["url"],
+        })
+    return parsed or None
+
+def build_final_messages(user_query: str, classification: dict, context: any):
+    system_prompt = (
+        "You are a helpful, expert customer service agent for appliance parts — "
+        "specifically refrigerators and dishwashers. Your role is to assist users with "
+        "part installation, compatibility, or troubleshooting using only the context provided. "
+        "Avoid guessing. If context is missing, politely say so — but if installation time or difficulty are missing, you may suggest a typical time range like 'usually under 30 minutes' and assume it's easy if not specified.\n\n"
+        "Answer must:\n"
+        "- Be clear, specific, and confident\n"
+        "- Stick to appliance part knowledge\n"
+        "- Include relevant installation difficulty and estimated time if possible\n"
+        "- Return the part's URL if available or else say 'not available'\n"
+        "- Return youtube video from context if available or else say 'not available'\n"
+    )
+
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": f"""Query: {user_query}
 
 Classification: {json.dumps(classification, indent=2)}
 
@@ -109,11 +234,13 @@ Context Retrieved:
 {json.dumps(context, indent=2) if isinstance(context, (dict, list)) else str(context)}
 
 Generate a user-facing response based on this context and classification."""}
-        ]
+    ]
 
-        response = deepseek_client.chat.completions.create(
+def generate_final_response(user_query: str, classification: dict, context: any):
+    try:
+        response = deepseek_client().chat.completions.create(
             model="deepseek-chat",
-            messages=messages,
+            messages=build_final_messages(user_query, classification, context),
             stream=False
         )
         return response.choices[0].message.content
@@ -121,70 +248,153 @@ Generate a user-facing response based on this context and classification."""}
     except Exception as e:
         return f"Error generating final response: {str(e)}"
 
-@app.route("/ask", methods=["POST"])
-def ask():
-    query = request.json.get("query", "")
+def stream_final_response(user_query: str, classification: dict, context: any):
     try:
-        classification_prompt = f"""
-You are a helpful and knowledgeable appliance repair assistant who specializes in refrigerator and dishwasher parts.
-
-Your job is to analyze user queries and classify them into one of three categories:
-1. "exact" — when the user asks specifically about how to install a part or get info about a part number.
-2. "compatibility" — when the user asks if a specific part is compatible with their appliance model.
-3. "semantic" — if it's a general symptom-based or brand/product inquiry.
-
-Strictly return a JSON with:
-"type": one of ["exact", "compatibility", "semantic", "out_of_scope"],
-"part_id": if mentioned (e.g., PS11752778),
-"model_id": if mentioned (e.g., WDT780SAEM1),
-"brand": if any (e.g., Whirlpool),
-"symptoms": if any (e.g., ice not working, leaking water),
-"product_types": if any (e.g., refrigerator, dishwasher)
-
-Only answer about refrigerator and dishwasher part questions. If the query is about something else, mark it as "out_of_scope".
-Now process this query: {query}
-"""
-
-        completion = deepseek_client.chat.completions.create(
+        stream = deepseek_client().chat.completions.create(
             model="deepseek-chat",
-            messages=[
-                {"role": "system", "content": "You are a helpful, focused assistant. Only answer about appliance parts."},
-                {"role": "user", "content": classification_prompt}
-            ],
-            stream=False
+            messages=build_final_messages(user_query, classification, context),
+            stream=True
         )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
 
-        raw_content = completion.choices[0].message.content
-        result = clean_and_parse_json(raw_content)
+    except Exception as e:
+        yield f"Error generating final response: {str(e)}"
 
-        query_type = result.get("type")
-        context_data = ""
+def classify_query(query: str) -> dict:
+    with admission.slot(predict_lane(query)):
+        return classify(deepseek_client(), query, stats=classification_stats)
+
+def retrieve_context(result: dict, snapshot=None):
+    snapshot = snapshot or catalog()
+    query_type = result.get("type")
 
-        if query_type == "out_of_scope":
-            context_data = {"response": "Sorry, I can only assist with refrigerator and dishwasher part queries."}
+    if query_type == "out_of_scope":
+        return {"response": "Sorry, I can only assist with refrigerator and dishwasher part queries."}
 
-        elif query_type == "exact" and result.get("part_id"):
-            context_data = exact_match(result["part_id"])
+    elif query_type == "exact" and result.get("part_id"):
+        return exact_match(result["part_id"], snapshot)
 
-        elif query_type == "compatibility" and result.get("part_id") and result.get("model_id"):
-            context_data = compatibility_check(result["part_id"], result["model_id"])
+    elif query_type == "compatibility" and result.get("part_id") and result.get("model_id"):
+        return compatibility_check(result["part_id"], result["model_id"], snapshot)
 
-        elif query_type == "semantic":
-            context_str = result.get("brand", "") + " " + str(result.get("product_types", "")) + " " + str(result.get("symptoms", ""))
-            context_data = semantic_lookup(context_str)
+    elif query_type == "semantic":
+        context_data = facet_lookup(result, snapshot=snapshot)
+        if context_data is None:
+            # Without ratings the facet match only narrows the search; Chroma ranks inside it
+            context_str = (result.get("brand") or "") + " " + str(result.get("product_types", "")) + " " + str(result.get("symptoms", ""))
+            context_data = semantic_lookup(context_str, product_types=result.get("product_types"), brand=result.get("brand"),
+                                           part_ids=facet_candidates(result, snapshot))
+        return context_data
 
-        else:
-            context_data = {"error": "Hmm, I couldn't confidently understand that query. Can you rephrase it?"}
+    return {"error": "Hmm, I couldn't confidently understand that query. Can you rephrase it?"}
 
-        final_response = generate_final_response(query, result, context_data)
-        return jsonify({"response": final_response})
+def answer_query(query: str, snapshot=None) -> dict:
+    # AdmissionRejected propagates so the route can answer 429/503
+    try:
+        result = classify_query(query)
+        query_type = result.get("type")
+        context_data = retrieve_context(result, snapshot)
+
+        if query_type == "semantic" and not context_data:
+            # Nothing passed the distance threshold; don't spend a generation on it
+            return {"response": NO_CONFIDENT_MATCH}
+
+        with admission.slot(lane_for_branch(query_type)):
+            final_response = generate_final_response(query, result, context_data)
+        return {"response": final_response}
+
+    except AdmissionRejected:
+        raise
 
     except Exception as e:
-        return jsonify({
+        return {
             "error": "Internal error during query classification",
             "details": str(e),
             "trace": traceback.format_exc()
-        })
+        }
+
+def stream_answer(query: str, snapshot=None):
+    try:
+        result = classify_query(query)
+        query_type = result.get("type")
+        context_data = retrieve_context(result, snapshot)
+
+        if query_type == "semantic" and not context_data:
+            yield NO_CONFIDENT_MATCH
+            return
+
+        with admission.slot(lane_for_branch(query_type)):
+            yield from stream_final_response(query, result, context_data)
+
+    except AdmissionRejected as e:
+        yield e.message
+
+    except Exception as e:
+        yield f"Internal error during query classification: {str(e)}"
+
+def client_id():
+    # remote_addr is the real peer, or the proxy-reported client when TRUSTED_PROXY_COUNT is set
+    return request.remote_addr or "unknown"
+
+def rejected_response(e: AdmissionRejected):
+    response = jsonify({"error": e.message})
+    response.status_code = e.status
+    response.headers["Retry-After"] = str(max(1, round(e.retry_after)))
+    return response
+
+@app.route("/admission/stats", methods=["GET"])
+def admission_stats():
+    return jsonify({**admission.stats(), "single_flight": single_flight.stats()})
+
+@app.route("/classification/stats", methods=["GET"])
+def classification_stats_route():
+    return jsonify(classification_stats.snapshot())
+
+@app.route("/ask", methods=["POST"])
+def ask():
+    query = request.json.get("query", "")
+    try:
+        admission.check_rate(client_id())
+        # Identical concurrent questions share one classification, retrieval and generation;
+        # the catalog version is part of the key so nothing is shared across a reload
+        snapshot = catalog()
+        key = (snapshot.version, *coalesce_key(query, request.json.get("session_id")))
+        return jsonify(single_flight.do(key, lambda: answer_query(query, snapshot)))
+    except AdmissionRejected as e:
+        return rejected_response(e)
+
+@app.route("/ask/stream", methods=["POST"])
+def ask_stream():
+    query = request.json.get("query", "")
+    try:
+        admission.check_rate(client_id())
+        # Once the stream starts the status is 200, so shed overload before returning it
+        admission.check_capacity(predict_lane(query))
+    except AdmissionRejected as e:
+        return rejected_response(e)
+
+    # Duplicates attach to the in-flight generation and receive the same tokens
+    snapshot = catalog()
+    key = (snapshot.version, *coalesce_key(query, request.json.get("session_id")))
+    return Response(single_flight.stream(key, lambda: stream_answer(query, snapshot)), mimetype="text/plain")
+
+def admin_authorized():
+    token = os.getenv("ADMIN_TOKEN")
+    return bool(token) and request.headers.get("X-Admin-Token") == token
+
+@app.route("/admin/reload", methods=["POST"])
+def admin_reload():
+    if not admin_authorized():
+        return jsonify({"error": "Unauthorized"}), 401
+    # Build and validate in the background; in-flight requests keep their catalog version
+    started = reloader.reload_async()
+    return jsonify({"started": started, **reloader.stats()}), 202
+
+@app.route("/admin/catalog", methods=["GET"])
+def admin_catalog():
+    return jsonify(reloader.stats())
 
 if __name__ == "__main__":
     app.run(port=5001, debug=True)
@@ -0,0 +1,39 @@
+NO_CONFIDENT_MATCH = (
+    "Sorry, I couldn't find a part that confidently matches that description. "
+    "Could you share your appliance model number or the part number printed on the old part?"
+)
+
+def select_hits(hits: list, max_distance: float, relative_gap: float, k: int, min_band: float = 0.0) -> list:
+    """Cut (distance, document) pairs, nearest first, by an absolute and a relative threshold.
+
+    ``max_distance`` comes from the calibration in chroma_db/evaluate_retrieval.py;
+    anything further away is treated as irrelevant. Of the survivors, only hits within
+    ``relative_gap`` of the best distance are kept, so a clear winner isn't padded with
+    weak neighbours while a tight cluster of good matches can fill all ``k`` slots.
+    ``min_band`` (calibrated alongside ``max_distance``, in the same distance space)
+    keeps a near-zero best distance from collapsing the relative cut to one result.
+    """
+    confident = [hit for hit in hits if hit[0] <= max_distance]
+    if not confident:
+        return []
+    best = confident[0][0]
+    cutoff = best + max(best * relative_gap, min_band)
+    return [hit for hit in confident if hit[0] <= cutoff][:k]
+
+
+class CrossEncoderReranker:
+    """Optional CPU cross-encoder pass over the surviving hits; the model loads on first use."""
+
+    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"):
+        self.model_name = model_name
+        self._model = None
+
+    def rerank(self, query: str, hits: list, k: int) -> list:
+        if len(hits) < 2:
+            return hits
+        if self._model is None:
+            from sentence_transformers import CrossEncoder
+            self._model = CrossEncoder(self.model_name, device="cpu")
+        scores = self._model.predict([(query, document) for _, document in hits])
+        ranked = sorted(zip(scores, hits), key=lambda pair: pair[0], reverse=True)
+        return [hit for _, hit in ranked[:k]]
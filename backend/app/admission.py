@@ -0,0 +1,189 @@
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Lower number = served first. Exact / compatibility answers carry a tiny prompt,
+# semantic answers carry several retrieved parts, so they wait behind the cheap lane.
+LANE_PRIORITY = {"cheap": 0, "expensive": 1}
+BRANCH_LANES = {
+    "exact": "cheap",
+    "compatibility": "cheap",
+    "out_of_scope": "cheap",
+    "semantic": "expensive",
+}
+PART_NUMBER_PATTERN = re.compile(r"\bPS\d{5,}\b", re.IGNORECASE)
+
+
+def predict_lane(query: str) -> str:
+    # Before classification the only signal is the text: part numbers mean a lookup
+    return "cheap" if PART_NUMBER_PATTERN.search(query or "") else "expensive"
+
+
+def lane_for_branch(query_type: str) -> str:
+    return BRANCH_LANES.get(query_type, "expensive")
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status: int, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Consume one token; returns 0 on success or the seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def idle(self, now: float) -> bool:
+        # Untouched long enough to have refilled: dropping it loses nothing
+        return now - self.updated >= self.burst / self.rate
+
+
+class AdmissionController:
+    """Bounded, prioritized admission for outstanding LLM calls.
+
+    At most ``max_concurrency`` calls run at once; up to ``max_queue`` more wait,
+    cheap lanes first. A request is shed with 503 when the predicted or actual
+    wait exceeds ``slo_ms``, and with 429 when its client exceeds its rate.
+    """
+
+    def __init__(self, max_concurrency=8, max_queue=32, slo_ms=5000, rate=2.0, burst=10):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.slo_ms = slo_ms
+        self.rate = rate
+        self.burst = burst
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._waiting = []
+        self._seq = 0
+        self._buckets = {}
+        self._last_prune = time.monotonic()
+        self._service_ms = 1000.0  # EWMA of slot hold time, seeded pessimistically
+        self._waits_ms = deque(maxlen=1000)
+        self._counters = {"admitted": 0, "rejected_rate": 0, "rejected_queue_full": 0, "rejected_slo": 0}
+
+    def _prune_buckets(self):
+        # At most once per refill window, so the sweep is amortized across requests
+        now = time.monotonic()
+        if now - self._last_prune < self.burst / self.rate:
+            return
+        self._last_prune = now
+        for client_id in [cid for cid, bucket in self._buckets.items() if bucket.idle(now)]:
+            del self._buckets[client_id]
+
+    def check_rate(self, client_id: str):
+        with self._cond:
+            self._prune_buckets()
+            bucket = self._buckets.get(client_id)
+            if bucket is None:
+                bucket = self._buckets[client_id] = TokenBucket(self.rate, self.burst)
+            retry_after = bucket.take()
+            if retry_after:
+                self._counters["rejected_rate"] += 1
+                raise AdmissionRejected(429, "Too many requests, please slow down.", retry_after)
+
+    def check_capacity(self, lane: str):
+        """Sheds now what ``slot`` would shed on arrival, for callers that can't answer 503 later."""
+        priority = LANE_PRIORITY.get(lane, max(LANE_PRIORITY.values()))
+        with self._cond:
+            if len(self._waiting) >= self.max_queue:
+                self._counters["rejected_queue_full"] += 1
+                raise AdmissionRejected(503, "Server is busy, please retry shortly.", self._service_ms / 1000)
+            ahead = sum(1 for other_priority, _ in self._waiting if other_priority <= priority)
+            if self._predicted_wait_ms(ahead) > self.slo_ms:
+                self._counters["rejected_slo"] += 1
+                raise AdmissionRejected(503, "Server is busy, please retry shortly.", self._service_ms / 1000)
+
+    def _ahead_of(self, ticket) -> int:
+        return sum(1 for other in self._waiting if other < ticket)
+
+    def _predicted_wait_ms(self, ahead: int) -> float:
+        if self._in_flight < self.max_concurrency and ahead == 0:
+            return 0.0
+        return self._service_ms * (ahead + 1) / self.max_concurrency
+
+    @contextmanager
+    def slot(self, lane: str):
+        ticket = (LANE_PRIORITY.get(lane, max(LANE_PRIORITY.values())), self._next_seq())
+        start = time.monotonic()
+        with self._cond:
+            if len(self._waiting) >= self.max_queue:
+                self._counters["rejected_queue_full"] += 1
+                raise AdmissionRejected(503, "Server is busy, please retry shortly.", self._service_ms / 1000)
+
+            self._waiting.append(ticket)
+            if self._predicted_wait_ms(self._ahead_of(ticket)) > self.slo_ms:
+                self._waiting.remove(ticket)
+                self._counters["rejected_slo"] += 1
+                raise AdmissionRejected(503, "Server is busy, please retry shortly.", self._service_ms / 1000)
+
+            deadline = start + self.slo_ms / 1000
+            while self._in_flight >= self.max_concurrency or min(self._waiting) != ticket:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiting.remove(ticket)
+                    self._counters["rejected_slo"] += 1
+                    self._cond.notify_all()
+                    raise AdmissionRejected(503, "Server is busy, please retry shortly.", self._service_ms / 1000)
+                self._cond.wait(remaining)
+
+            self._waiting.remove(ticket)
+            self._in_flight += 1
+            self._counters["admitted"] += 1
+            self._waits_ms.append((time.monotonic() - start) * 1000)
+            self._cond.notify_all()
+
+        acquired = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                held_ms = (time.monotonic() - acquired) * 1000
+                self._service_ms = 0.8 * self._service_ms + 0.2 * held_ms
+                self._cond.notify_all()
+
+    def _next_seq(self) -> int:
+        with self._cond:
+            self._seq += 1
+            return self._seq
+
+    def stats(self) -> dict:
+        with self._cond:
+            waits = sorted(self._waits_ms)
+            depth = {lane: 0 for lane in LANE_PRIORITY}
+            for priority, _ in self._waiting:
+                for lane, lane_priority in LANE_PRIORITY.items():
+                    if lane_priority == priority:
+                        depth[lane] += 1
+            return {
+                "in_flight": self._in_flight,
+                "max_concurrency": self.max_concurrency,
+                "queue_depth": len(self._waiting),
+                "queue_depth_by_lane": depth,
+                "max_queue": self.max_queue,
+                "rate_limited_clients": len(self._buckets),
+                "slo_ms": self.slo_ms,
+                "service_ms_ewma": round(self._service_ms, 1),
+                "wait_ms_p50": round(waits[len(waits) // 2], 1) if waits else 0.0,
+                "wait_ms_p95": round(waits[int(len(waits) * 0.95)], 1) if waits else 0.0,
+                **self._counters,
+            }
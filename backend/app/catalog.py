@@ -0,0 +1,180 @@
+import json
+import os
+import threading
+import time
+
+from catalog_terms import SHARD_MANIFEST_PATH
+from parts_graph import load_parts_graph
+from facet_index import load_facet_index
+
+CATALOG_FILES = {
+    "part_id_map": "part_id_map.json",
+    "model_to_parts_map": "model_to_parts_map.json",
+    "parts_graph": "parts_graph.json",
+    "facet_index": "facet_index.json",
+}
+# The shard manifest changes when ingest_parts.py publishes new Chroma shards
+WATCHED_FILES = {**CATALOG_FILES, "chroma_shards": SHARD_MANIFEST_PATH}
+# Every part_id_map field exact_match and facet_lookup read
+REQUIRED_PART_FIELDS = ("part_id", "title", "url", "brand", "description", "symptoms", "product_types",
+                        "installation_difficulty", "installation_time", "video_url")
+MAX_MISSING_FACET_PARTS = 0.01  # facet_index.json built from a different scrape than part_id_map.json
+
+
+class Catalog:
+    """One immutable version of the lookup maps and indexes.
+
+    Requests grab the current Catalog once and use it throughout, so a reload that
+    swaps in a new version never changes data under an in-flight request.
+    """
+
+    def __init__(self, version, part_id_map, model_to_parts_map, parts_graph, facet_index, mtimes):
+        self.version = version
+        self.part_id_map = part_id_map
+        self.model_to_parts_map = model_to_parts_map
+        self.parts_graph = parts_graph
+        self.facet_index = facet_index
+        self.mtimes = mtimes
+        self.loaded_at = time.time()
+
+
+def source_mtimes() -> dict:
+    return {name: os.path.getmtime(path) for name, path in WATCHED_FILES.items() if os.path.exists(path)}
+
+
+def load_catalog(version: int = 1) -> Catalog:
+    mtimes = source_mtimes()
+    with open(CATALOG_FILES["part_id_map"], "r") as f:
+        part_id_map = json.load(f)
+    with open(CATALOG_FILES["model_to_parts_map"], "r") as f:
+        model_to_parts_map = {model: set(parts) for model, parts in json.load(f).items()}
+
+    catalog = Catalog(
+        version=version,
+        part_id_map=part_id_map,
+        model_to_parts_map=model_to_parts_map,
+        parts_graph=load_parts_graph(CATALOG_FILES["parts_graph"]),
+        facet_index=load_facet_index(CATALOG_FILES["facet_index"]),
+        mtimes=mtimes,
+    )
+    validate_catalog(catalog)
+    return catalog
+
+
+def validate_catalog(catalog: Catalog):
+    if not catalog.part_id_map:
+        raise ValueError("part_id_map is empty")
+    if not catalog.model_to_parts_map:
+        raise ValueError("model_to_parts_map is empty")
+
+    for pid, meta in catalog.part_id_map.items():
+        missing = [field for field in REQUIRED_PART_FIELDS if not isinstance(meta.get(field), str)]
+        if missing:
+            raise ValueError(f"part_id_map entry {pid} is missing or has non-text {', '.join(missing)}")
+
+    ranked = catalog.facet_index.ranked_parts
+    if ranked:
+        unknown = sum(1 for pid in ranked if pid not in catalog.part_id_map)
+        if unknown / len(ranked) > MAX_MISSING_FACET_PARTS:
+            raise ValueError(f"facet_index has {unknown} parts missing from part_id_map; rebuild it")
+
+
+def validate_router(router):
+    if router.count() == 0:
+        raise ValueError("no Chroma shard has any parts; run chroma_db/ingest_parts.py")
+
+
+class CatalogReloader:
+    """Builds a new catalog (and Chroma shard router) in the background and swaps it in.
+
+    Triggered by the admin endpoint or by a polling watcher on the catalog files and
+    the shard manifest. Only one reload runs at a time; a failed build or validation
+    leaves the current version serving, and the watcher doesn't retry until the files
+    change again. Shard versions older than both the new and the retired router are
+    dropped after the swap, so in-flight requests never lose their collections.
+    """
+
+    def __init__(self, catalog_resource, router_resource, load_router):
+        self.catalog = catalog_resource
+        self.router = router_resource
+        self.load_router = load_router
+        self._lock = threading.Lock()
+        self._watcher = None
+        self.last_reload = None
+
+    def reload(self) -> dict:
+        if not self._lock.acquire(blocking=False):
+            return {"status": "already_running"}
+        try:
+            start = time.perf_counter()
+            current = self.catalog()
+            mtimes = source_mtimes()
+            try:
+                new_catalog = load_catalog(version=current.version + 1)
+                # Only rebuild the router if it's in use; in lazy mode it loads fresh on first use
+                new_router = self.load_router() if self.router.loaded else None
+                if new_router is not None:
+                    validate_router(new_router)
+            except Exception as e:
+                self.last_reload = {"status": "failed", "error": str(e), "version": current.version,
+                                    "mtimes": mtimes, "finished_at": time.time()}
+                return self.last_reload
+
+            build_seconds = time.perf_counter() - start
+            self.catalog.swap(new_catalog)
+            dropped = []
+            if new_router is not None:
+                old_router = self.router()
+                self.router.swap(new_router)
+                try:
+                    dropped = new_router.drop_stale(keep=old_router.names)
+                except Exception as e:
+                    # Leftover collections only cost disk; the next reload tries again
+                    dropped = [f"failed: {e}"]
+
+            self.last_reload = {
+                "status": "ok",
+                "version": new_catalog.version,
+                "shard_versions": new_router.versions if new_router is not None else None,
+                "dropped_shards": dropped,
+                "build_seconds": round(build_seconds, 4),
+                "total_seconds": round(time.perf_counter() - start, 4),
+                "finished_at": time.time(),
+            }
+            return self.last_reload
+        finally:
+            self._lock.release()
+
+    def reload_async(self) -> bool:
+        if self._lock.locked():
+            return False
+        threading.Thread(target=self.reload, daemon=True, name="catalog-reload").start()
+        return True
+
+    def start_watcher(self, interval: float):
+        if interval <= 0 or self._watcher is not None:
+            return
+
+        def watch():
+            while True:
+                time.sleep(interval)
+                if not self.catalog.loaded:
+                    continue
+                mtimes = source_mtimes()
+                failed = self.last_reload if self.last_reload and self.last_reload["status"] == "failed" else None
+                if mtimes != self.catalog().mtimes and (failed is None or mtimes != failed["mtimes"]):
+                    # Give the writer a moment to finish before reading
+                    time.sleep(min(interval, 1.0))
+                    self.reload()
+
+        self._watcher = threading.Thread(target=watch, daemon=True, name="catalog-watcher")
+        self._watcher.start()
+
+    def stats(self) -> dict:
+        current = self.catalog() if self.catalog.loaded else None
+        return {
+            "version": current.version if current else None,
+            "loaded_at": current.loaded_at if current else None,
+            "reloading": self._lock.locked(),
+            "last_reload": self.last_reload,
+        }
@@ -0,0 +1,128 @@
+import json
+import os
+import re
+
+# Normalization, shard-naming and document tables shared by the app and the build
+# scripts (scripts/save_*.py, chroma_db/*.py). Kept free of third-party imports so
+# every side can load it; the scripts put the app folder on sys.path first.
+
+CHROMA_DIR = "./chroma_appliance_parts"
+SHARD_SEPARATOR = "__"
+# Which shard version each category serves, written by ingest_parts.py once a version is
+# complete: {"partselect_parts": {"dishwasher": 1718000000, ...}}
+SHARD_MANIFEST_PATH = os.path.join(CHROMA_DIR, "shards.json")
+SHARD_VERSION_PATTERN = re.compile(r"v(\d+)")
+# Classifier wording -> the product type terms used in the CSVs and the facet index
+PRODUCT_TYPE_SYNONYMS = {
+    "fridge": "refrigerator",
+    "fridges": "refrigerator",
+    "refrigerators": "refrigerator",
+    "dish washer": "dishwasher",
+    "dish washers": "dishwasher",
+    "dishwashers": "dishwasher",
+    "freezers": "freezer",
+    "ice makers": "ice maker",
+}
+# Product type -> appliance category, i.e. the shard it lives in
+CATEGORY_ALIASES = {
+    "refrigerator": "refrigerator",
+    "freezer": "refrigerator",
+    "ice maker": "refrigerator",
+    "dishwasher": "dishwasher",
+}
+BRAND_FAMILIES = {
+    "whirlpool": "whirlpool",
+    "kitchenaid": "whirlpool",
+    "maytag": "whirlpool",
+    "amana": "whirlpool",
+    "jennair": "whirlpool",
+    "frigidaire": "electrolux",
+    "electrolux": "electrolux",
+    "ge": "ge",
+    "hotpoint": "ge",
+    "bosch": "bsh",
+    "thermador": "bsh",
+    "lg": "lg",
+    "samsung": "samsung",
+}
+
+
+def brand_family(brand) -> str:
+    return BRAND_FAMILIES.get(str(brand or "").strip().lower(), "other")
+
+
+def shard_name(base: str, key: tuple, version: int) -> str:
+    return SHARD_SEPARATOR.join([base, *key, f"v{version}"])
+
+
+def collection_names(client) -> list:
+    # list_collections returns names in newer chromadb releases, Collection objects in older ones
+    return [entry if isinstance(entry, str) else entry.name for entry in client.list_collections()]
+
+
+def parse_shard_name(base: str, name: str):
+    """(key, version) for ``<base>__<category>[__<family>][__v<N>]``; unversioned shards are version 0."""
+    prefix = base + SHARD_SEPARATOR
+    if not name.startswith(prefix):
+        return None
+    segments = name[len(prefix):].split(SHARD_SEPARATOR)
+    match = SHARD_VERSION_PATTERN.fullmatch(segments[-1])
+    if match and len(segments) > 1:
+        return tuple(segments[:-1]), int(match.group(1))
+    return tuple(segments), 0
+
+
+def load_shard_manifest(path: str = SHARD_MANIFEST_PATH) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_shard_manifest(manifest: dict, path: str = SHARD_MANIFEST_PATH):
+    # Replace in one step so the app never reads a half-written manifest
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+def product_type(term: str) -> str:
+    return PRODUCT_TYPE_SYNONYMS.get(term, term)
+
+
+def product_category(term: str):
+    return CATEGORY_ALIASES.get(product_type(term))
+
+
+def normalize_number(value: str) -> str:
+    # Part / manufacturer numbers: case, spaces and hyphens don't matter
+    return re.sub(r"[\s\-]", "", value.strip().lower())
+
+
+def normalize_term(value: str) -> str:
+    # Facet terms: lowercase words, curly quotes folded, punctuation dropped
+    value = value.lower().replace("’", "'").replace("‘", "'")
+    value = re.sub(r"[^a-z0-9' ]+", " ", value)
+    return " ".join(value.split())
+
+
+# Candidate pool semantic_lookup fetches before cutting by distance; the retrieval
+# evaluation calibrates SEMANTIC_MAX_DISTANCE over a pool of the same size
+DEFAULT_SEMANTIC_CANDIDATES = 15
+
+
+def part_document(row) -> str:
+    # Text embedded per part, by ingest_parts.py and by the retrieval evaluation
+    return f"""
+        Title: {row['title']}
+        Description: {row['description']}
+        Symptoms: {row['symptoms']}
+        Product Types: {row['product_types']}
+        Part ID: {row['part_id']}
+        Brand: {row['brand']}
+        Installation: {row['installation_difficulty']} in {row['installation_time']}
+        Related Parts: {row['related_parts']}
+        Replacement Parts: {row['replacement_parts']}
+        URL: {row['video_url']}
+        """
@@ -0,0 +1,151 @@
+import json
+import re
+import threading
+
+CLASSIFICATION_MODEL = "deepseek-chat"
+CLASSIFICATION_MAX_TOKENS = 200
+QUERY_TYPES = ("exact", "compatibility", "semantic", "out_of_scope")
+
+# Static prefix: identical on every call, so the provider's prompt cache can reuse it.
+# The query is sent alone in the user message.
+CLASSIFICATION_SYSTEM_PROMPT = """Classify support queries about refrigerator and dishwasher parts. Reply with one JSON object only:
+{"type": "exact" | "compatibility" | "semantic" | "out_of_scope", "part_id": string | null, "model_id": string | null, "brand": string | null, "symptoms": [string], "product_types": [string]}
+- exact: info or installation for a specific part number (e.g. PS11752778)
+- compatibility: whether a part fits an appliance model (e.g. WDT780SAEM1)
+- semantic: symptom, brand or product questions without a specific part
+- out_of_scope: anything not about refrigerator or dishwasher parts
+Use null or [] for anything not mentioned."""
+
+PART_ID_PATTERN = re.compile(r"\bPS\d{5,}\b", re.IGNORECASE)
+MODEL_ID_PATTERN = re.compile(r"\b(?!PS\d)(?=[A-Z0-9-]*\d)(?=[A-Z0-9-]*[A-Z])[A-Z0-9-]{6,}\b")
+
+
+class ClassificationError(ValueError):
+    pass
+
+
+def _optional_str(data: dict, key: str):
+    value = data.get(key)
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise ClassificationError(f'"{key}" must be a string or null')
+    return value.strip() or None
+
+
+def _str_list(data: dict, key: str) -> list:
+    value = data.get(key)
+    if value is None:
+        return []
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ClassificationError(f'"{key}" must be a list of strings')
+    return [v.strip() for v in value if v.strip()]
+
+
+def validate_classification(raw: str) -> dict:
+    """Parse and strictly validate the model's JSON; unknown keys are dropped."""
+    try:
+        data = json.loads(raw)
+    except (TypeError, json.JSONDecodeError) as e:
+        raise ClassificationError(f"not valid JSON: {e}")
+    if not isinstance(data, dict):
+        raise ClassificationError("expected a JSON object")
+    if data.get("type") not in QUERY_TYPES:
+        raise ClassificationError(f'"type" must be one of {", ".join(QUERY_TYPES)}')
+
+    return {
+        "type": data["type"],
+        "part_id": _optional_str(data, "part_id"),
+        "model_id": _optional_str(data, "model_id"),
+        "brand": _optional_str(data, "brand"),
+        "symptoms": _str_list(data, "symptoms"),
+        "product_types": _str_list(data, "product_types"),
+    }
+
+
+def fallback_classification(query: str) -> dict:
+    # Last resort when the model's output can't be validated: answer from the text alone
+    part = PART_ID_PATTERN.search(query or "")
+    text_without_part = PART_ID_PATTERN.sub(" ", query or "")
+    model = MODEL_ID_PATTERN.search(text_without_part.upper())
+    if part and model:
+        query_type = "compatibility"
+    elif part:
+        query_type = "exact"
+    else:
+        query_type = "semantic"
+    return {
+        "type": query_type,
+        "part_id": part.group(0).upper() if part else None,
+        "model_id": model.group(0) if model else None,
+        "brand": None,
+        "symptoms": [query.strip()] if query_type == "semantic" and query.strip() else [],
+        "product_types": [],
+    }
+
+
+class ClassificationStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "calls": 0, "repairs": 0, "fallbacks": 0,
+                         "prompt_tokens": 0, "completion_tokens": 0, "cached_prompt_tokens": 0}
+
+    def record_call(self, usage):
+        with self._lock:
+            self.counters["calls"] += 1
+            if usage is not None:
+                self.counters["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+                self.counters["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+                self.counters["cached_prompt_tokens"] += getattr(usage, "prompt_cache_hit_tokens", 0) or 0
+
+    def increment(self, key: str):
+        with self._lock:
+            self.counters[key] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+        requests = counters["requests"] or 1
+        counters.update({
+            "prompt_tokens_per_request": round(counters["prompt_tokens"] / requests, 1),
+            "completion_tokens_per_request": round(counters["completion_tokens"] / requests, 1),
+            "repair_rate": round(counters["repairs"] / requests, 4),
+            "failure_rate": round(counters["fallbacks"] / requests, 4),
+        })
+        return counters
+
+
+def classify(client, query: str, stats: ClassificationStats = None) -> dict:
+    """Classify with JSON-mode output, one bounded repair attempt, then a heuristic fallback."""
+    stats = stats or ClassificationStats()
+    stats.increment("requests")
+    messages = [
+        {"role": "system", "content": CLASSIFICATION_SYSTEM_PROMPT},
+        {"role": "user", "content": query},
+    ]
+
+    for attempt in range(2):
+        # Provider errors propagate; only unusable output is repaired or falls back
+        completion = client.chat.completions.create(
+            model=CLASSIFICATION_MODEL,
+            messages=messages,
+            response_format={"type": "json_object"},
+            max_tokens=CLASSIFICATION_MAX_TOKENS,
+            temperature=0,
+            stream=False
+        )
+        stats.record_call(getattr(completion, "usage", None))
+        raw = completion.choices[0].message.content
+
+        try:
+            return validate_classification(raw)
+        except ClassificationError as e:
+            if attempt == 0:
+                stats.increment("repairs")
+                messages = messages + [
+                    {"role": "assistant", "content": raw or ""},
+                    {"role": "user", "content": f"Invalid: {e}. Reply with the corrected JSON object only."},
+                ]
+
+    stats.increment("fallbacks")
+    return fallback_classification(query)
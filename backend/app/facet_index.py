@@ -0,0 +1,91 @@
+import json
+import os
+import re
+
+from catalog_terms import normalize_term, product_type
+
+
+def as_terms(value) -> list:
+    # Classifier fields come back as a string, a list, or nothing
+    if not value:
+        return []
+    values = value if isinstance(value, (list, tuple)) else re.split(r"[,|;]", str(value))
+    return [t for t in (normalize_term(str(v)) for v in values) if t]
+
+
+class FacetIndex:
+    """Inverted index from normalized symptom / brand / product type to ranked part ids.
+
+    Built by scripts/save_facet_index.py. Posting lists are held as sets of rank
+    positions, so intersecting them gives the candidate parts for a query. ``rated``
+    says whether the rank order comes from real ratings; without them the order is
+    just part id, so candidates are only usable as a filter for vector search.
+    """
+
+    def __init__(self, data: dict):
+        self.ranked_parts = data.get("ranked_parts", [])
+        self.rated = data.get("rated", False)
+        rank = {pid: i for i, pid in enumerate(self.ranked_parts)}
+        self.postings = {
+            facet: {term: frozenset(rank[pid] for pid in pids) for term, pids in terms.items()}
+            for facet, terms in data.get("facets", {}).items()
+        }
+        # Token sets let "dishwasher not draining" match the "not draining" facet
+        self.symptom_tokens = {
+            term: frozenset(term.split()) for term in self.postings.get("symptom", {})
+        }
+
+    def match_symptoms(self, symptoms) -> list:
+        matched = []
+        for query in as_terms(symptoms):
+            if query in self.symptom_tokens:
+                matched.append(query)
+                continue
+            tokens = set(query.split())
+            matched.extend(
+                term for term, term_tokens in self.symptom_tokens.items()
+                if term_tokens <= tokens or tokens <= term_tokens
+            )
+        return list(dict.fromkeys(matched))
+
+    def _union(self, facet: str, terms: list):
+        postings = self.postings.get(facet, {})
+        sets = [postings[t] for t in terms if t in postings]
+        if not sets:
+            return None
+        return frozenset().union(*sets)
+
+    def candidates(self, symptoms=None, brand=None, product_types=None):
+        """Part ids matching every facet in rank order, or None when the query doesn't map onto known facets."""
+        symptom_terms = self.match_symptoms(symptoms)
+        if not symptom_terms:
+            return None
+
+        candidates = [self._union("symptom", symptom_terms)]
+        types = [product_type(t) for t in as_terms(product_types)]
+        for facet, terms in (("brand", as_terms(brand)), ("product_type", types)):
+            if not terms:
+                continue
+            postings = self._union(facet, terms)
+            if postings is None:
+                # A brand or product type we have never seen can't be answered here
+                return None
+            candidates.append(postings)
+
+        candidates.sort(key=len)
+        hits = candidates[0].intersection(*candidates[1:])
+        return [self.ranked_parts[i] for i in sorted(hits)]
+
+    def lookup(self, symptoms=None, brand=None, product_types=None, k: int = 5):
+        """Top-k part ids by rating, or None when the index is unrated or the query doesn't map onto known facets."""
+        if not self.rated:
+            return None
+        hits = self.candidates(symptoms, brand, product_types)
+        return hits[:k] if hits is not None else None
+
+
+def load_facet_index(path: str = "facet_index.json") -> FacetIndex:
+    if not os.path.exists(path):
+        return FacetIndex({})
+    with open(path, "r") as f:
+        return FacetIndex(json.load(f))
@@ -0,0 +1,46 @@
+import threading
+import time
+
+
+class LazyResource:
+    """A value built by ``loader`` on first call and cached afterwards.
+
+    Heavy imports (chromadb, openai, torch via sentence_transformers) live inside
+    the loaders, so nothing is imported or opened until a request needs it. Load
+    time is recorded for scripts/profile_startup.py. ``swap`` replaces the value
+    with a single reference assignment, so readers see either the old or the new
+    version and never a half-built one.
+    """
+
+    def __init__(self, name: str, loader):
+        self.name = name
+        self.loader = loader
+        self.load_seconds = None
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def __call__(self):
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                start = time.perf_counter()
+                self._value = self.loader()
+                self.load_seconds = time.perf_counter() - start
+                self._loaded = True
+        return self._value
+
+    def swap(self, value):
+        with self._lock:
+            self._value = value
+            self._loaded = True
+
+
+def warm_up(resources: list):
+    for resource in resources:
+        resource()
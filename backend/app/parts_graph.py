@@ -0,0 +1,91 @@
+import json
+import os
+
+from catalog_terms import normalize_number
+
+
+class PartsGraph:
+    """In-memory supersession / related-parts index built by scripts/save_parts_graph.py.
+
+    Node and alias ids are interned ints; edges are CSR adjacency arrays, so every
+    lookup is a dict hit plus a slice.
+    """
+
+    def __init__(self, data: dict):
+        self.nodes = data.get("nodes", [])
+        self.aliases = data.get("aliases", [])
+        self.related_offsets = data.get("related_offsets", [0])
+        self.related_targets = data.get("related_targets", [])
+        self.replaces_offsets = data.get("replaces_offsets", [0])
+        self.replaces_targets = data.get("replaces_targets", [])
+        self.superseded_by = data.get("superseded_by", [])
+        self.own_numbers = data.get("own_numbers", [])
+
+        self.node_index = {pid: i for i, pid in enumerate(self.nodes)}
+
+        # Invert node -> replaced numbers into number -> current nodes
+        alias_nodes = {}
+        for node in range(len(self.nodes)):
+            for alias_id in self._slice(self.replaces_offsets, self.replaces_targets, node):
+                alias_nodes.setdefault(alias_id, []).append(self._current(node))
+        self.alias_index = {
+            self.aliases[alias_id]: tuple(dict.fromkeys(targets))
+            for alias_id, targets in alias_nodes.items()
+        }
+
+        # A part's own manufacturer number, kept apart so it never reads as superseded
+        own_nodes = {}
+        for node, alias_id in enumerate(self.own_numbers):
+            if alias_id != -1:
+                own_nodes.setdefault(self.aliases[alias_id], []).append(node)
+        self.own_index = {number: tuple(nodes) for number, nodes in own_nodes.items()}
+
+    @staticmethod
+    def _slice(offsets, targets, node):
+        if node + 1 >= len(offsets):
+            return []
+        return targets[offsets[node]:offsets[node + 1]]
+
+    def _current(self, node: int) -> int:
+        if node < len(self.superseded_by) and self.superseded_by[node] != -1:
+            return self.superseded_by[node]
+        return node
+
+    def resolve(self, number: str) -> list:
+        """Map a PS number, a manufacturer number or an old superseded number to current part ids."""
+        key = normalize_number(number)
+        node = self.node_index.get(key)
+        if node is not None:
+            return [self.nodes[self._current(node)]]
+        if key in self.own_index:
+            return list(dict.fromkeys(self.nodes[self._current(n)] for n in self.own_index[key]))
+        return [self.nodes[n] for n in self.alias_index.get(key, ())]
+
+    def superseded(self, number: str) -> bool:
+        """True when the number belongs to a part that another current part replaces."""
+        key = normalize_number(number)
+        node = self.node_index.get(key)
+        if node is not None:
+            return self._current(node) != node
+        if key in self.own_index:
+            return any(self._current(n) != n for n in self.own_index[key])
+        return key in self.alias_index
+
+    def related(self, part_id: str) -> list:
+        node = self.node_index.get(normalize_number(part_id))
+        if node is None:
+            return []
+        return [self.nodes[n] for n in self._slice(self.related_offsets, self.related_targets, node)]
+
+    def replaces(self, part_id: str) -> list:
+        node = self.node_index.get(normalize_number(part_id))
+        if node is None:
+            return []
+        return [self.aliases[a] for a in self._slice(self.replaces_offsets, self.replaces_targets, node)]
+
+
+def load_parts_graph(path: str = "parts_graph.json") -> PartsGraph:
+    if not os.path.exists(path):
+        return PartsGraph({})
+    with open(path, "r") as f:
+        return PartsGraph(json.load(f))
@@ -0,0 +1,102 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from catalog_terms import (SHARD_MANIFEST_PATH, brand_family, collection_names, load_shard_manifest,
+                           parse_shard_name, product_category)
+from facet_index import as_terms
+
+# Shared by every router, so routers retired by a reload leave no threads behind
+FAN_OUT_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="shard")
+
+
+class ShardRouter:
+    """Routes semantic queries to per-appliance (and optionally per-brand-family) collections.
+
+    Shards are collections named ``<base>__<category>[__<family>]__v<N>`` written by
+    chroma_db/ingest_parts.py, which publishes each complete version in the shard
+    manifest; the router only opens published versions, so a re-ingest never touches
+    the collections a running router reads. Categories missing from the manifest use
+    unversioned shards from older ingests. Queries fan out in parallel to every shard
+    that could match and results are merged by distance. With no shards on disk the
+    router falls back to the single ``<base>`` collection.
+    """
+
+    def __init__(self, client, base_name: str, manifest_path: str = SHARD_MANIFEST_PATH):
+        self.client = client
+        self.base_name = base_name
+        self.manifest_path = manifest_path
+        self.executor = FAN_OUT_EXECUTOR
+        self.shards = {}
+        self.versions = {}
+        self.names = set()
+        self.refresh()
+
+    def refresh(self):
+        published = load_shard_manifest(self.manifest_path).get(self.base_name, {})
+        shards, versions, names = {}, {}, set()
+        for name in collection_names(self.client):
+            parsed = parse_shard_name(self.base_name, name)
+            if parsed is None:
+                continue
+            key, version = parsed
+            if version != published.get(key[0], 0):
+                # Superseded, or still being written by an ingest
+                continue
+            shards[key] = self.client.get_collection(name=name)
+            versions[key[0]] = version
+            names.add(name)
+        if not shards:
+            shards[()] = self.client.get_or_create_collection(name=self.base_name)
+            names.add(self.base_name)
+        self.shards, self.versions, self.names = shards, versions, names
+
+    def count(self) -> int:
+        return sum(collection.count() for collection in self.shards.values())
+
+    def drop_stale(self, keep=()) -> list:
+        """Delete shard versions older than the ones this router serves, except names in ``keep``."""
+        dropped = []
+        for name in collection_names(self.client):
+            parsed = parse_shard_name(self.base_name, name)
+            if parsed is None or name in self.names or name in keep:
+                continue
+            key, version = parsed
+            if key[0] in self.versions and version < self.versions[key[0]]:
+                self.client.delete_collection(name)
+                dropped.append(name)
+        return dropped
+
+    @property
+    def space(self) -> str:
+        # Distance space of the shards (ingest writes them all with the same HNSW_METADATA)
+        collection = next(iter(self.shards.values()))
+        return (collection.metadata or {}).get("hnsw:space", "l2")
+
+    def route(self, product_types=None, brand=None) -> list:
+        if () in self.shards:
+            return [self.shards[()]]
+
+        categories = {product_category(t) for t in as_terms(product_types)} - {None}
+        keys = [key for key in self.shards if not categories or key[0] in categories]
+
+        family = brand_family(brand) if brand else None
+        if family and any(len(key) > 1 and key[1] == family for key in keys):
+            keys = [key for key in keys if len(key) > 1 and key[1] == family]
+
+        return [self.shards[key] for key in (keys or self.shards)]
+
+    def query(self, query: str, k: int = 5, product_types=None, brand=None, where=None) -> list:
+        """Returns up to k (distance, document) pairs, nearest first, across routed shards."""
+        targets = self.route(product_types, brand)
+
+        def search(collection):
+            results = collection.query(query_texts=[query], n_results=k, where=where,
+                                       include=["documents", "distances"])
+            return list(zip(results["distances"][0], results["documents"][0]))
+
+        if len(targets) == 1:
+            hits = search(targets[0])
+        else:
+            hits = [hit for shard_hits in self.executor.map(search, targets) for hit in shard_hits]
+
+        hits.sort(key=lambda hit: hit[0])
+        return hits[:k]
@@ -0,0 +1,113 @@
+import threading
+
+
+def coalesce_key(query: str, session_id=None) -> tuple:
+    # Case, whitespace and trailing punctuation don't change the answer
+    text = " ".join((query or "").lower().split()).rstrip("?!. ")
+    return (session_id or "", text)
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _Broadcast:
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.chunks = []
+        self.done = False
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces identical concurrent requests onto one in-flight computation.
+
+    ``do`` runs ``fn`` once per key while duplicates wait for and share its result.
+    ``stream`` drives a chunk generator once per key on a background thread and fans
+    every chunk out to all current readers; readers that join late replay the chunks
+    already produced. Keys are released as soon as the computation ends, so this
+    only deduplicates concurrent work and never serves stale results.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._streams = {}
+        self._counters = {"leaders": 0, "coalesced": 0, "stream_leaders": 0, "stream_coalesced": 0}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._counters["leaders"] += 1
+            else:
+                self._counters["coalesced"] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def stream(self, key, generator_fn):
+        with self._lock:
+            broadcast = self._streams.get(key)
+            if broadcast is None:
+                broadcast = self._streams[key] = _Broadcast()
+                self._counters["stream_leaders"] += 1
+                threading.Thread(target=self._produce, args=(key, broadcast, generator_fn), daemon=True).start()
+            else:
+                self._counters["stream_coalesced"] += 1
+        return self._consume(broadcast)
+
+    def _produce(self, key, broadcast, generator_fn):
+        try:
+            for chunk in generator_fn():
+                with broadcast.cond:
+                    broadcast.chunks.append(chunk)
+                    broadcast.cond.notify_all()
+        except Exception as e:
+            broadcast.error = e
+        finally:
+            with self._lock:
+                self._streams.pop(key, None)
+            with broadcast.cond:
+                broadcast.done = True
+                broadcast.cond.notify_all()
+
+    @staticmethod
+    def _consume(broadcast):
+        position = 0
+        while True:
+            with broadcast.cond:
+                while position >= len(broadcast.chunks) and not broadcast.done:
+                    broadcast.cond.wait()
+                chunks = broadcast.chunks[position:]
+                finished = broadcast.done
+            for chunk in chunks:
+                yield chunk
+            position += len(chunks)
+            if finished and position >= len(broadcast.chunks):
+                if broadcast.error is not None:
+                    raise broadcast.error
+                return
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"in_flight": len(self._calls), "streams_in_flight": len(self._streams), **self._counters}
@@ -0,0 +1,126 @@
+import importlib.util
+import json
+import os
+import re
+import sys
+import time
+
+# Before/after comparison of the classification step against the live DeepSeek API:
+# prompt and completion tokens, latency and failure rate for the original free-form
+# prompt + fence stripping versus app/classification.py. Needs DEEPSEEK_API_KEY.
+# Run from the backend folder:
+#   python benchmarks/bench_classification.py
+
+APP_DIR = "app"
+QUERIES = [
+    "How can I install part number PS11752778?",
+    "Is PS11701542 compatible with my WDT780SAEM1 model?",
+    "The ice maker on my Whirlpool fridge is not working. How can I fix it?",
+    "My Bosch dishwasher is not draining",
+    "Dishwasher door won't close, GE",
+    "what replaced W10195622",
+    "Frigidaire refrigerator too warm and noisy",
+    "Does PS734936 fit 004621710A?",
+    "tell me about PS11750071",
+    "Samsung fridge leaking water under the crisper",
+    "How do I fix my washing machine?",
+    "what's the weather today",
+]
+
+
+# --- BEFORE: the original classification prompt and parser ---
+def legacy_prompt(query):
+    return f"""
+You are a helpful and knowledgeable appliance repair assistant who specializes in refrigerator and dishwasher parts.
+
+Your job is to analyze user queries and classify them into one of three categories:
+1. "exact" — when the user asks specifically about how to install a part or get info about a part number.
+2. "compatibility" — when the user asks if a specific part is compatible with their appliance model.
+3. "semantic" — if it's a general symptom-based or brand/product inquiry.
+
+Strictly return a JSON with:
+"type": one of ["exact", "compatibility", "semantic", "out_of_scope"],
+"part_id": if mentioned (e.g., PS11752778),
+"model_id": if mentioned (e.g., WDT780SAEM1),
+"brand": if any (e.g., Whirlpool),
+"symptoms": if any (e.g., ice not working, leaking water),
+"product_types": if any (e.g., refrigerator, dishwasher)
+
+Only answer about refrigerator and dishwasher part questions. If the query is about something else, mark it as "out_of_scope".
+Now process this query: {query}
+"""
+
+
+def legacy_classify(client, query):
+    completion = client.chat.completions.create(
+        model="deepseek-chat",
+        messages=[
+            {"role": "system", "content": "You are a helpful, focused assistant. Only answer about appliance parts."},
+            {"role": "user", "content": legacy_prompt(query)}
+        ],
+        stream=False
+    )
+    raw = completion.choices[0].message.content
+    usage = completion.usage
+    try:
+        cleaned = re.sub(r"^```json|```$", "", raw.strip(), flags=re.MULTILINE).strip()
+        json.loads(cleaned)
+        failed = False
+    except Exception:
+        failed = True
+    return usage.prompt_tokens, usage.completion_tokens, failed
+
+
+def load_classification():
+    sys.path.insert(0, APP_DIR)
+    spec = importlib.util.spec_from_file_location("classification", os.path.join(APP_DIR, "classification.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def summarize(label, rows):
+    n = len(rows)
+    prompt = sum(r[0] for r in rows) / n
+    completion = sum(r[1] for r in rows) / n
+    failures = sum(1 for r in rows if r[2])
+    latency = sorted(r[3] for r in rows)
+    print(f"{label:<8} prompt {prompt:7.1f} tok  completion {completion:6.1f} tok  "
+          f"failures {failures}/{n} ({failures / n:.0%})  p50 {latency[n // 2]:.2f}s")
+
+
+def main():
+    from dotenv import load_dotenv
+    from openai import OpenAI
+    load_dotenv()
+    if not os.getenv("DEEPSEEK_API_KEY"):
+        print("DEEPSEEK_API_KEY is not set.")
+        sys.exit(1)
+
+    client = OpenAI(
+        api_key=os.getenv("DEEPSEEK_API_KEY"),
+        base_url=os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com/v1")
+    )
+    classification = load_classification()
+
+    before, after = [], []
+    for query in QUERIES:
+        start = time.perf_counter()
+        prompt_tokens, completion_tokens, failed = legacy_classify(client, query)
+        before.append((prompt_tokens, completion_tokens, failed, time.perf_counter() - start))
+
+        stats = classification.ClassificationStats()
+        start = time.perf_counter()
+        result = classification.classify(client, query, stats)
+        counters = stats.snapshot()
+        after.append((counters["prompt_tokens"], counters["completion_tokens"],
+                      counters["fallbacks"] > 0, time.perf_counter() - start))
+        print(f"  {query[:60]:<60} -> {result['type']}{' (repaired)' if counters['repairs'] else ''}")
+
+    print()
+    summarize("before", before)
+    summarize("after", after)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import importlib.util
+import os
+import random
+import sys
+import threading
+import time
+
+# Hot-reload benchmark: measures how long a catalog reload takes and checks that
+# lookup latency p99 under load isn't disrupted while versions are swapped.
+# Run from the backend folder:
+#   python benchmarks/bench_reload.py
+
+APP_DIR = "app"
+WORKERS = 4
+BASELINE_SECONDS = 2.0
+RELOADS = 5
+
+BUDGET = {
+    "reload_seconds": 2.0,        # build + validate + swap, per reload
+    "p99_ratio": 2.0,             # p99 during reloads vs. baseline p99 ...
+    "p99_slack_ms": 25.0,         # ... or baseline + this much, whichever is larger
+}
+
+
+def import_app():
+    os.environ["LAZY_IMPORTS"] = "1"
+    sys.path.insert(0, APP_DIR)
+    spec = importlib.util.spec_from_file_location("partselect_app", os.path.join(APP_DIR, "__init__.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+def main():
+    module = import_app()
+    snapshot = module.catalog()
+    part_ids = list(snapshot.part_id_map)
+    models = [m for m, parts in snapshot.model_to_parts_map.items() if parts]
+
+    samples = []  # (finished_at, latency_ms, version)
+    stop = threading.Event()
+
+    def worker():
+        rng = random.Random()
+        while not stop.is_set():
+            start = time.perf_counter()
+            current = module.catalog()
+            module.exact_match(rng.choice(part_ids), current)
+            module.compatibility_check(rng.choice(part_ids), rng.choice(models), current)
+            end = time.perf_counter()
+            samples.append((end, (end - start) * 1000, current.version))
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(WORKERS)]
+    for t in threads:
+        t.start()
+
+    time.sleep(BASELINE_SECONDS)
+    baseline_end = time.perf_counter()
+
+    windows, reloads = [], []
+    for _ in range(RELOADS):
+        start = time.perf_counter()
+        result = module.reloader.reload()
+        windows.append((start, time.perf_counter()))
+        reloads.append(result)
+        time.sleep(0.2)
+
+    stop.set()
+    for t in threads:
+        t.join()
+
+    baseline = [ms for at, ms, _ in samples if at <= baseline_end]
+    during = [ms for at, ms, _ in samples if any(lo <= at <= hi for lo, hi in windows)]
+    failed = [r for r in reloads if r.get("status") != "ok"]
+    reload_seconds = [r["total_seconds"] for r in reloads if r.get("status") == "ok"]
+
+    base_p99 = percentile(baseline, 99)
+    during_p99 = percentile(during, 99)
+    allowed_p99 = max(base_p99 * BUDGET["p99_ratio"], base_p99 + BUDGET["p99_slack_ms"])
+
+    print(f"lookups: {len(baseline)} baseline, {len(during)} during reloads")
+    print(f"reload: p50 {percentile(reload_seconds, 50):.3f}s, max {max(reload_seconds, default=0):.3f}s "
+          f"(budget {BUDGET['reload_seconds']:.1f}s), final version {module.catalog().version}")
+    print(f"lookup p99: baseline {base_p99:.2f} ms, during reloads {during_p99:.2f} ms "
+          f"(allowed {allowed_p99:.2f} ms)")
+
+    problems = [f"reload failed: {r.get('error')}" for r in failed]
+    if reload_seconds and max(reload_seconds) > BUDGET["reload_seconds"]:
+        problems.append("reload slower than budget")
+    if during and during_p99 > allowed_p99:
+        problems.append("p99 latency disrupted during reload")
+
+    if problems:
+        print("\nFAIL: " + "; ".join(problems))
+        sys.exit(1)
+    print("\nReload within budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import json
+import subprocess
+import sys
+
+# Startup-time regression budget. Fails (exit 1) when importing the app in lazy
+# mode, or any single resource's first load, exceeds its budget. Run from the
+# backend folder:
+#   python benchmarks/bench_startup.py
+
+BUDGET_SECONDS = {
+    "lazy_import": 0.5,       # time until the Flask app object exists with LAZY_IMPORTS=1
+    "eager_import": 15.0,     # everything loaded up front, including chromadb and openai
+    "resource": 5.0,          # first use of any single lazy resource
+}
+
+
+def main():
+    output = subprocess.run(
+        [sys.executable, "scripts/profile_startup.py", "--json"],
+        capture_output=True, text=True, check=True
+    )
+    report = json.loads(output.stdout)
+
+    checks = [
+        ("lazy_import", "import app (lazy)", report["lazy"].get("import", report["lazy"])),
+        ("eager_import", "import app (eager)", report["eager"].get("import", report["eager"])),
+    ]
+    for name, row in report["lazy"].get("resources", {}).items():
+        checks.append(("resource", f"resource {name}", row))
+
+    failures = []
+    for budget_key, label, row in checks:
+        budget = BUDGET_SECONDS[budget_key]
+        if "seconds" not in row or row.get("error"):
+            failures.append(f"{label}: {row.get('error')}")
+            print(f"FAIL {label}: {row.get('error')}")
+            continue
+        status = "ok  " if row["seconds"] <= budget else "FAIL"
+        print(f"{status} {label}: {row['seconds']:.3f}s (budget {budget:.1f}s), +{row['rss_mb']} MB")
+        if row["seconds"] > budget:
+            failures.append(label)
+
+    if failures:
+        print(f"\n{len(failures)} startup budget check(s) failed.")
+        sys.exit(1)
+    print("\nStartup within budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+import os
+import sys
+import csv
+import json
+import time
+import itertools
+from collections import defaultdict
+
+import chromadb
+
+APP_DIR = "app"
+sys.path.insert(0, APP_DIR)
+
+from catalog_terms import DEFAULT_SEMANTIC_CANDIDATES, part_document
+
+# Offline retrieval evaluation for the partselect_parts collection.
+# Builds labeled queries from the scraped CSVs, indexes the same documents
+# ingest_parts.py writes into throwaway in-memory collections, and sweeps HNSW
+# parameters and embedding backends. Run from the backend folder:
+#   python chroma_db/evaluate_retrieval.py
+
+# --- CONFIG ---
+CSV_PATHS = [
+    "data/appliance_parts_dishwasher.csv",
+    "data/appliance_parts_refrigerator.csv"
+]
+REPORT_DIR = "reports"
+REPORT_NAME = "retrieval_eval"
+
+K_VALUES = [1, 3, 5, 10]
+DEPLOY_K = 5                  # k used by semantic_lookup in app/__init__.py
+LATENCY_BUDGET_MS = 25.0      # p95 query latency allowed for a deployable config
+MAX_QUERIES = 300             # cap on labeled queries, 0 for no cap
+CALIBRATION_PCT = 95          # share of relevant hits the distance threshold must keep
+# Pool semantic_lookup fetches and cuts with the threshold; calibrating on a smaller
+# pool would miss the farther relevant hits and bias max_distance low
+CANDIDATE_POOL = int(os.getenv("SEMANTIC_CANDIDATES", DEFAULT_SEMANTIC_CANDIDATES))
+
+EMBEDDING_BACKENDS = [
+    "chroma-default",                         # what query_texts= uses in the app
+    "sentence-transformers/all-MiniLM-L6-v2", # what ingest_parts.py writes with
+    "sentence-transformers/all-mpnet-base-v2",
+]
+HNSW_GRID = {
+    "space": ["l2", "cosine", "ip"],
+    "M": [16, 32],
+    "construction_ef": [100, 200],
+    "search_ef": [10, 50, 100],
+}
+
+# Chroma's defaults, used to label the baseline row in the report
+DEFAULT_HNSW = {"space": "l2", "M": 16, "construction_ef": 100, "search_ef": 10}
+
+
+# --- LOAD ---
+def load_rows(paths):
+    rows = []
+    seen = set()
+    for path in paths:
+        with open(path, mode="r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                pid = (row.get("part_id") or "").strip()
+                if not pid or pid == "N/A" or pid.lower() in seen:
+                    continue
+                seen.add(pid.lower())
+                rows.append({k: (v or "") for k, v in row.items() if k})
+    return rows
+
+
+def split_field(value, sep):
+    if not value or value.strip() == "N/A":
+        return []
+    return [v.strip().rstrip(".").strip() for v in value.split(sep) if v.strip()]
+
+
+def format_query(brand, product_type, symptom):
+    # Same shape as the context_str the /ask semantic branch sends to Chroma
+    return brand + " " + str([product_type.lower()]) + " " + str([symptom])
+
+
+def build_labeled_queries(rows, max_queries=MAX_QUERIES):
+    """Group parts by (brand, product type, symptom); every part in a group is relevant."""
+    groups = defaultdict(set)
+    for row in rows:
+        brand = row["brand"].strip()
+        if not brand or brand == "N/A":
+            continue
+        for ptype in split_field(row["product_types"], ","):
+            for symptom in split_field(row["symptoms"], "|"):
+                groups[(brand, ptype, symptom)].add(row["part_id"].strip().lower())
+
+    queries = [
+        {"query": format_query(*key), "relevant": relevant}
+        for key, relevant in sorted(groups.items())
+    ]
+    if max_queries:
+        # Deterministic thinning that keeps brands and symptoms spread out
+        step = max(1, len(queries) // max_queries)
+        queries = queries[::step][:max_queries]
+    return queries
+
+
+# --- EMBEDDINGS ---
+def get_embedder(backend):
+    if backend == "chroma-default":
+        from chromadb.utils import embedding_functions
+        ef = embedding_functions.DefaultEmbeddingFunction()
+        return lambda texts: [list(map(float, v)) for v in ef(texts)]
+
+    if backend.startswith("sentence-transformers/"):
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(backend.split("/", 1)[1])
+        return lambda texts: model.encode(texts, batch_size=64).tolist()
+
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+
+# --- METRICS ---
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def score_ranking(ranked, relevant, k_values):
+    # recall@k is capped at min(|relevant|, k) so large symptom groups stay comparable
+    scores = {}
+    for k in k_values:
+        hits = len(set(ranked[:k]) & relevant)
+        scores[f"recall@{k}"] = hits / min(len(relevant), k)
+    rr = 0.0
+    for rank, pid in enumerate(ranked, start=1):
+        if pid in relevant:
+            rr = 1.0 / rank
+            break
+    scores["mrr"] = rr
+    return scores
+
+
+def evaluate_config(client, hnsw, doc_ids, doc_vectors, documents, queries, query_vectors):
+    name = "eval_{space}_{M}_{construction_ef}_{search_ef}".format(**hnsw)
+    try:
+        client.delete_collection(name)
+    except Exception:
+        pass
+
+    collection = client.create_collection(
+        name=name,
+        embedding_function=None,
+        metadata={f"hnsw:{key}": value for key, value in hnsw.items()}
+    )
+
+    build_start = time.perf_counter()
+    batch = 500
+    for i in range(0, len(doc_ids), batch):
+        collection.add(
+            ids=doc_ids[i:i + batch],
+            embeddings=doc_vectors[i:i + batch],
+            documents=documents[i:i + batch],
+        )
+    build_s = time.perf_counter() - build_start
+
+    n_results = max(max(K_VALUES), CANDIDATE_POOL)
+    totals = defaultdict(float)
+    latencies = []
+    relevant_distances = []
+    relevant_spreads = []
+    for q, vec in zip(queries, query_vectors):
+        start = time.perf_counter()
+        results = collection.query(query_embeddings=[vec], n_results=n_results, include=["distances"])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        ranked = results["ids"][0]
+        # Ranking metrics stay over the top max(K_VALUES); the full pool feeds calibration
+        for metric, value in score_ranking(ranked[:max(K_VALUES)], q["relevant"], K_VALUES).items():
+            totals[metric] += value
+        distances = results["distances"][0]
+        relevant_distances.extend(
+            d for pid, d in zip(ranked, distances) if pid in q["relevant"]
+        )
+        # How far behind the best hit the relevant parts of a top-DEPLOY_K answer sit
+        relevant_spreads.extend(
+            d - distances[0] for pid, d in zip(ranked[1:DEPLOY_K], distances[1:DEPLOY_K]) if pid in q["relevant"]
+        )
+
+    client.delete_collection(name)
+
+    n = len(queries)
+    row = {metric: round(total / n, 4) for metric, total in totals.items()}
+    row.update({
+        "latency_p50_ms": round(percentile(latencies, 50), 3),
+        "latency_p95_ms": round(percentile(latencies, 95), 3),
+        "build_s": round(build_s, 3),
+        # Distance that keeps CALIBRATION_PCT% of relevant hits: SEMANTIC_MAX_DISTANCE in the app
+        "max_distance": round(percentile(relevant_distances, CALIBRATION_PCT), 4),
+        # Band around the best hit keeping half of those: SEMANTIC_MIN_BAND in the app
+        "min_band": round(percentile(relevant_spreads, 50), 4),
+    })
+    return row
+
+
+# --- REPORT ---
+def pick_deployable(results):
+    key = f"recall@{DEPLOY_K}"
+    within_budget = [r for r in results if r["latency_p95_ms"] <= LATENCY_BUDGET_MS]
+    pool = within_budget or results
+    return max(pool, key=lambda r: (r[key], r["mrr"], -r["latency_p95_ms"]))
+
+
+def write_report(results, baseline, best, n_docs, n_queries):
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    json_path = os.path.join(REPORT_DIR, f"{REPORT_NAME}.json")
+    md_path = os.path.join(REPORT_DIR, f"{REPORT_NAME}.md")
+
+    with open(json_path, "w") as f:
+        json.dump({"baseline": baseline, "recommended": best, "results": results}, f, indent=2)
+
+    metric_cols = [f"recall@{k}" for k in K_VALUES] + ["mrr", "latency_p50_ms", "latency_p95_ms", "build_s", "max_distance", "min_band"]
+    header = ["backend", "space", "M", "construction_ef", "search_ef"] + metric_cols
+    ranked = sorted(results, key=lambda r: (-r[f"recall@{DEPLOY_K}"], -r["mrr"], r["latency_p95_ms"]))
+
+    lines = [
+        "# Retrieval evaluation — partselect_parts",
+        "",
+        f"{n_docs} documents, {n_queries} labeled queries (brand + product type + symptom).",
+        f"Selection: best recall@{DEPLOY_K}, then MRR, with p95 latency <= {LATENCY_BUDGET_MS} ms.",
+        "",
+        "## Recommended configuration",
+        "",
+        "```python",
+        f"# embedding backend: {best['backend']}",
+        "collection = client.get_or_create_collection(",
+        "    name=COLLECTION_NAME,",
+        "    metadata={",
+        f"        \"hnsw:space\": \"{best['space']}\",",
+        f"        \"hnsw:M\": {best['M']},",
+        f"        \"hnsw:construction_ef\": {best['construction_ef']},",
+        f"        \"hnsw:search_ef\": {best['search_ef']},",
+        "    }",
+        ")",
+        "```",
+        "",
+        f"Calibrated distance threshold ({CALIBRATION_PCT}% of relevant hits kept): "
+        f"`SEMANTIC_MAX_DISTANCE={best['max_distance']}`, `SEMANTIC_MIN_BAND={best['min_band']}` "
+        f"with `SEMANTIC_DISTANCE_SPACE={best['space']}`.",
+        "Distances depend on the embedding backend and `hnsw:space`, so rerun this whenever either changes.",
+        "",
+    ]
+    if baseline:
+        delta = best[f"recall@{DEPLOY_K}"] - baseline[f"recall@{DEPLOY_K}"]
+        lines += [
+            f"Against the current default ({baseline['backend']}, Chroma default HNSW): "
+            f"recall@{DEPLOY_K} {baseline[f'recall@{DEPLOY_K}']:.3f} -> {best[f'recall@{DEPLOY_K}']:.3f} "
+            f"({delta:+.3f}), MRR {baseline['mrr']:.3f} -> {best['mrr']:.3f}, "
+            f"p95 {baseline['latency_p95_ms']:.2f} ms -> {best['latency_p95_ms']:.2f} ms.",
+            f"If the current default stays deployed, use `SEMANTIC_MAX_DISTANCE={baseline['max_distance']}`, "
+            f"`SEMANTIC_MIN_BAND={baseline['min_band']}` with `SEMANTIC_DISTANCE_SPACE={baseline['space']}`.",
+            "",
+        ]
+    lines += [
+        "## All configurations",
+        "",
+        "| " + " | ".join(header) + " |",
+        "|" + "---|" * len(header),
+    ]
+    for r in ranked:
+        lines.append("| " + " | ".join(str(r[col]) for col in header) + " |")
+
+    with open(md_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+    return md_path, json_path
+
+
+# --- MAIN ---
+def main():
+    rows = load_rows(CSV_PATHS)
+    queries = build_labeled_queries(rows)
+    print(f"📥 {len(rows)} parts, {len(queries)} labeled queries")
+
+    doc_ids = [row["part_id"].strip().lower() for row in rows]
+    documents = [part_document(row) for row in rows]
+    query_texts = [q["query"] for q in queries]
+
+    client = chromadb.EphemeralClient()
+    grid = [dict(zip(HNSW_GRID, values)) for values in itertools.product(*HNSW_GRID.values())]
+
+    results = []
+    for backend in EMBEDDING_BACKENDS:
+        try:
+            embed = get_embedder(backend)
+        except Exception as e:
+            print(f"Skipping backend {backend}: {e}")
+            continue
+
+        print(f"\nEmbedding with {backend}...")
+        doc_vectors = embed(documents)
+        query_vectors = embed(query_texts)
+
+        for hnsw in grid:
+            row = evaluate_config(client, hnsw, doc_ids, doc_vectors, documents, queries, query_vectors)
+            row = {"backend": backend, **hnsw, **row}
+            results.append(row)
+            print(f"  {hnsw} recall@{DEPLOY_K}={row[f'recall@{DEPLOY_K}']:.3f} "
+                  f"mrr={row['mrr']:.3f} p95={row['latency_p95_ms']:.2f}ms")
+
+    if not results:
+        print("No configurations evaluated.")
+        return
+
+    baseline = next(
+        (r for r in results
+         if r["backend"] == EMBEDDING_BACKENDS[0] and all(r[k] == v for k, v in DEFAULT_HNSW.items())),
+        None
+    )
+    best = pick_deployable(results)
+    md_path, json_path = write_report(results, baseline, best, len(rows), len(queries))
+    print(f"\nRecommended: {best}")
+    print(f"Report saved to {md_path} and {json_path}")
+
+
+if __name__ == "__main__":
+    main()
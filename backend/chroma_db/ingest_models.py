@@ -1,10 +1,20 @@
 import csv
+import sys
 import chromadb
 from chromadb.config import Settings
 
-CHROMA_DIR = "chroma_store"
-CSV_PATH = "data/model_parts_map_refrigerator.csv"
+APP_DIR = "app"
+sys.path.insert(0, APP_DIR)
+
+from catalog_terms import SHARD_SEPARATOR
+
+# Same store as the parts shards; one model_parts__<category> collection per appliance
+CHROMA_DIR = "./chroma_appliance_parts"
 COLLECTION_NAME = "model_parts"
+CATEGORY_CSVS = {
+    "dishwasher": "data/model_parts_map_dishwasher.csv",
+    "refrigerator": "data/model_parts_map_refrigerator.csv",
+}
 
 def load_csv(path):
     data = []
@@ -18,24 +28,28 @@ def main():
     # New client interface — no deprecated error
     client = chromadb.PersistentClient(path=CHROMA_DIR)
 
-    try:
-        client.delete_collection(COLLECTION_NAME)  # Optional cleanup
-    except:
-        pass
+    # Rebuild only the categories named on the command line, or all of them
+    categories = sys.argv[1:] or list(CATEGORY_CSVS)
+    for category in categories:
+        if category not in CATEGORY_CSVS:
+            print(f"Unknown category: {category}")
+            continue
 
-    collection = client.get_or_create_collection(COLLECTION_NAME)
+        name = SHARD_SEPARATOR.join([COLLECTION_NAME, category])
+        try:
+            client.delete_collection(name)  # Optional cleanup
+        except:
+            pass
 
-    records = load_csv(CSV_PATH)
-    print(f"📥 Ingesting {len(records)} records into ChromaDB...")
+        collection = client.get_or_create_collection(name)
 
-    for idx, row in enumerate(records):
-        model_name = row["model_name"]
-        part_ids = row["part_ids"]
+        records = load_csv(CATEGORY_CSVS[category])
+        print(f"📥 Ingesting {len(records)} records into {name}...")
 
         collection.add(
-            documents=[part_ids],
-            metadatas=[{"model": model_name}],
-            ids=[f"model-part-{idx}"]
+            documents=[row["part_ids"] for row in records],
+            metadatas=[{"model": row["model_name"], "category": category} for row in records],
+            ids=[f"model-part-{category}-{idx}" for idx in range(len(records))]
         )
 
     print("Ingestion complete.")
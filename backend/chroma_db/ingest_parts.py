@@ -1,70 +1,112 @@
 import os
+import sys
+import time
 import chromadb
 from chromadb.config import Settings
 from uuid import uuid4
 import pandas as pd
 from sentence_transformers import SentenceTransformer
 
-CHROMA_DIR = "./chroma_appliance_parts"
+APP_DIR = "app"
+sys.path.insert(0, APP_DIR)
+
+from catalog_terms import (CHROMA_DIR, brand_family, collection_names, load_shard_manifest, part_document,
+                           save_shard_manifest, shard_name)
 
 # --- CONFIG ---  # Replace with your actual CSV file paths
 COLLECTION_NAME = "partselect_parts"
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"  # Swap with DeepSeek embedding if needed
 
+# One shard per appliance category: partselect_parts__<category>__v<N>.
+# Adding a category only needs its CSV here and `python chroma_db/ingest_parts.py <category>`.
+# Each run writes a new version next to the live one and publishes it in the shard
+# manifest when complete; the backend swaps it in and drops the old version.
+CATEGORY_CSVS = {
+    "dishwasher": "data/appliance_parts_dishwasher.csv",
+    "refrigerator": "data/appliance_parts_refrigerator.csv",
+}
+# Split each category further into partselect_parts__<category>__<brand family>__v<N>
+SHARD_BY_BRAND_FAMILY = False
+HNSW_METADATA = {}  # e.g. the recommended block from reports/retrieval_eval.md
+
 # --- INIT ---
 client = chromadb.PersistentClient(path=CHROMA_DIR)
-collection = client.get_or_create_collection(name=COLLECTION_NAME)
 embedder = SentenceTransformer(EMBEDDING_MODEL)
 
+
+def category_shard_name(category, brand, version):
+    key = (category, brand_family(brand)) if SHARD_BY_BRAND_FAMILY else (category,)
+    return shard_name(COLLECTION_NAME, key, version)
+
+
+def next_version(published):
+    # Timestamps keep versions ordered; never reuse or go below a published one
+    return max([int(time.time())] + [v + 1 for v in published.values()])
+
+
 # --- LOAD + INGEST ---
-def ingest_csv_to_chroma(file_path, start_idx=0):
+def ingest_csv_to_chroma(file_path, category, version):
     df = pd.read_csv(file_path).fillna("")
+    df = df.drop_duplicates(subset="part_id")
+
+    shards = {}
+    for _, row in df.iterrows():
+        content = part_document(row)
 
-    for i, row in df.iterrows():
-        idx = start_idx + i
-        part_id = f"part_{idx}"
-
-        content = f"""
-        Title: {row['title']}
-        Description: {row['description']}
-        Symptoms: {row['symptoms']}
-        Product Types: {row['product_types']}
-        Part ID: {row['part_id']}
-        Brand: {row['brand']}
-        Installation: {row['installation_difficulty']} in {row['installation_time']}
-        Related Parts: {row['related_parts']}
-        Replacement Parts: {row['replacement_parts']}
-        URL: {row['video_url']}
-        """
-
-        embedding = embedder.encode(content).tolist()
         metadata = {
             "product_types": row["product_types"],
             "symptoms": row["symptoms"],
             "brand": row["brand"],
-            "part_id": row['part_id']
+            "part_id": row['part_id'],
+            "category": category,
+            "brand_family": brand_family(row["brand"])
         }
 
+        batch = shards.setdefault(category_shard_name(category, row["brand"], version),
+                                  {"ids": [], "documents": [], "metadatas": []})
+        batch["ids"].append(f"{category}_{row['part_id']}")
+        batch["documents"].append(content)
+        batch["metadatas"].append(metadata)
+
+    for name, batch in shards.items():
+        if name in collection_names(client):
+            # Left over from an interrupted run that was never published
+            client.delete_collection(name)
+        collection = client.create_collection(name=name, metadata=HNSW_METADATA or None)
+        embeddings = embedder.encode(batch["documents"], batch_size=64).tolist()
         collection.add(
-            ids=[part_id],
-            embeddings=[embedding],
-            documents=[content],
-            metadatas=[metadata]
+            ids=batch["ids"],
+            embeddings=embeddings,
+            documents=batch["documents"],
+            metadatas=batch["metadatas"]
         )
+        print(f"📥 {name}: {len(batch['ids'])} parts")
 
-def main():
-    # Initialize Chroma client
-    client = chromadb.PersistentClient(path=CHROMA_DIR)
-    collection = client.get_or_create_collection(name="partselect_parts")
 
-    # Ingest CSVs
-    ingest_csv_to_chroma("data/appliance_parts_dishwasher.csv")
-    ingest_csv_to_chroma("data/appliance_parts_refrigerator.csv")
+def main():
+    # Rebuild only the categories named on the command line, or all of them
+    categories = sys.argv[1:] or list(CATEGORY_CSVS)
+    manifest = load_shard_manifest()
+    published = manifest.setdefault(COLLECTION_NAME, {})
+    version = next_version(published)
+    for category in categories:
+        if category not in CATEGORY_CSVS:
+            print(f"Unknown category: {category}")
+            continue
+        ingest_csv_to_chroma(CATEGORY_CSVS[category], category, version)
+        # Publish only once the category's shards are complete
+        published[category] = version
+        save_shard_manifest(manifest)
+        print(f"Published {category} v{version}")
 
     # print("Ingestion complete.")
 
+    if "refrigerator" not in categories:
+        return
+
     # Test query
     query = "Whirlpool fridge ice maker not working"
+    collection = client.get_collection(name=category_shard_name("refrigerator", "Whirlpool", version))
     results = collection.query(
         query_texts=[query],
         n_results=5
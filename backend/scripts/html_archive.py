@@ -0,0 +1,86 @@
+import hashlib
+import os
+import sqlite3
+import time
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # zstd is preferred, zlib keeps the archive usable without it
+    zstandard = None
+
+# Content-addressed store of raw page HTML:
+#   <root>/index.sqlite           url, fetch time and content hash of every snapshot
+#   <root>/blobs/ab/abcdef....zst compressed HTML, one blob per distinct page body
+# Identical pages fetched twice share a blob, so re-crawls only grow the index.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    url TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    sha256 TEXT NOT NULL,
+    codec TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (url, fetched_at)
+);
+CREATE INDEX IF NOT EXISTS snapshots_sha256 ON snapshots (sha256);
+"""
+
+CODEC_SUFFIX = {"zstd": ".zst", "zlib": ".zz"}
+
+
+class HtmlArchive:
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(os.path.join(root, "blobs"), exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(root, "index.sqlite"))
+        self.db.executescript(SCHEMA)
+        self.codec = "zstd" if zstandard else "zlib"
+
+    def _blob_path(self, sha, codec):
+        return os.path.join(self.root, "blobs", sha[:2], sha + CODEC_SUFFIX[codec])
+
+    def put(self, url, html, fetched_at=None):
+        raw = html.encode("utf-8")
+        sha = hashlib.sha256(raw).hexdigest()
+
+        existing = self.db.execute("SELECT codec FROM snapshots WHERE sha256 = ? LIMIT 1", (sha,)).fetchone()
+        codec = existing[0] if existing else self.codec
+        path = self._blob_path(sha, codec)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            data = zstandard.ZstdCompressor(level=10).compress(raw) if codec == "zstd" else zlib.compress(raw, 9)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+
+        self.db.execute(
+            "INSERT OR REPLACE INTO snapshots (url, fetched_at, sha256, codec, size) VALUES (?, ?, ?, ?, ?)",
+            (url, fetched_at or time.time(), sha, codec, len(raw))
+        )
+        self.db.commit()
+        return sha
+
+    def get(self, sha, codec):
+        with open(self._blob_path(sha, codec), "rb") as f:
+            data = f.read()
+        if codec == "zstd":
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read zstd blobs: pip install zstandard")
+            raw = zstandard.ZstdDecompressor().decompress(data)
+        else:
+            raw = zlib.decompress(data)
+        return raw.decode("utf-8")
+
+    def latest(self, url_contains=None):
+        """(url, fetched_at, sha256, codec) of the newest snapshot of every URL."""
+        query = """
+            SELECT url, MAX(fetched_at), sha256, codec FROM snapshots
+            WHERE (? IS NULL OR instr(url, ?) > 0)
+            GROUP BY url ORDER BY url
+        """
+        return self.db.execute(query, (url_contains, url_contains)).fetchall()
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,130 @@
+import argparse
+import importlib
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Cold-start profile of the backend. Every measurement runs in a fresh interpreter
+# so module caches from one step don't hide the cost of the next. Run from the
+# backend folder:
+#   python scripts/profile_startup.py          # table
+#   python scripts/profile_startup.py --json   # machine-readable, used by benchmarks/
+
+APP_DIR = "app"
+HEAVY_MODULES = ["flask", "dotenv", "openai", "chromadb", "sentence_transformers", "torch"]
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(fn):
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    error = None
+    try:
+        fn()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return {
+        "seconds": round(time.perf_counter() - start, 4),
+        "rss_mb": round(rss_mb() - rss_before, 1),
+        "error": error,
+    }
+
+
+def import_app():
+    sys.path.insert(0, APP_DIR)
+    spec = importlib.util.spec_from_file_location("partselect_app", os.path.join(APP_DIR, "__init__.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# --- CHILD PROCESSES ---
+def child_modules():
+    # Imported in order, so each row is the cost that module adds on top of the previous ones
+    return {name: measure(lambda name=name: importlib.import_module(name)) for name in HEAVY_MODULES}
+
+
+def child_app(lazy):
+    os.environ["LAZY_IMPORTS"] = "1" if lazy else "0"
+    holder = {}
+    result = {"import": measure(lambda: holder.setdefault("module", import_app()))}
+    module = holder.get("module")
+    if lazy and module is not None:
+        result["resources"] = {resource.name: measure(resource) for resource in module.RESOURCES}
+    return result
+
+
+def run_child(mode):
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", mode],
+        capture_output=True, text=True, env=os.environ.copy()
+    )
+    if output.returncode != 0:
+        return {"error": output.stderr.strip().splitlines()[-1] if output.stderr.strip() else "failed"}
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def profile():
+    return {
+        "python": sys.version.split()[0],
+        "modules": run_child("modules"),
+        "eager": run_child("eager"),
+        "lazy": run_child("lazy"),
+    }
+
+
+# --- REPORT ---
+def print_row(name, row):
+    if "seconds" not in row:
+        print(f"  {name:<24} {row.get('error')}")
+        return
+    note = f"  ({row['error']})" if row.get("error") else ""
+    print(f"  {name:<24} {row['seconds'] * 1000:>9.1f} ms {row['rss_mb']:>8.1f} MB{note}")
+
+
+def print_report(report):
+    print("Module imports (cumulative order):")
+    for name, row in report["modules"].items():
+        print_row(name, row)
+
+    for mode in ("eager", "lazy"):
+        result = report[mode]
+        print(f"\nimport app ({mode}):")
+        print_row("import", result.get("import", result))
+        for name, row in result.get("resources", {}).items():
+            print_row(name, row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile backend cold start.")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--child", choices=["modules", "eager", "lazy"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = child_modules() if args.child == "modules" else child_app(args.child == "lazy")
+        print(json.dumps(result))
+        return
+
+    report = profile()
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
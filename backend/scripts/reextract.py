@@ -0,0 +1,87 @@
+import argparse
+import csv
+import importlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from html_archive import HtmlArchive
+
+# Re-runs a scraper's parse_part_page over archived HTML instead of re-crawling.
+# Each worker process drives its own headless Chromium with all network requests
+# blocked, so the job is local and CPU-bound. Run from the backend folder:
+#   python scripts/reextract.py --archive html_archive --parser scraper_page \
+#       --output data/appliance_parts_reextracted.csv
+
+
+def extract_chunk(archive_root, parser_name, snapshots):
+    from playwright.sync_api import sync_playwright
+
+    parser = importlib.import_module(parser_name)
+    archive = HtmlArchive(archive_root)
+    rows, failures = [], []
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        context = browser.new_context(java_script_enabled=False)
+        context.route("**/*", lambda route: route.abort())
+        page = context.new_page()
+
+        for url, _, sha, codec in snapshots:
+            try:
+                page.set_content(archive.get(sha, codec), wait_until="domcontentloaded")
+                rows.append(parser.parse_part_page(page, url))
+            except Exception as e:
+                failures.append((url, f"{type(e).__name__}: {e}"))
+
+        browser.close()
+
+    archive.close()
+    return rows, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extract part data from archived HTML.")
+    parser.add_argument("--archive", default=os.getenv("HTML_ARCHIVE_DIR", "html_archive"))
+    parser.add_argument("--parser", default="scraper_page", choices=["scraper", "scraper_page"],
+                        help="scraper module whose parse_part_page is used")
+    parser.add_argument("--output", default="data/appliance_parts_reextracted.csv")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--url-contains", default="/PS", help="only re-extract URLs containing this")
+    args = parser.parse_args()
+
+    archive = HtmlArchive(args.archive)
+    snapshots = archive.latest(args.url_contains)
+    archive.close()
+    if not snapshots:
+        print(f"No archived pages in {args.archive}")
+        return
+
+    workers = max(1, min(args.workers, len(snapshots)))
+    chunks = [snapshots[i::workers] for i in range(workers)]
+    print(f"Re-extracting {len(snapshots)} pages with {workers} workers...")
+
+    start = time.perf_counter()
+    rows, failures = [], []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(extract_chunk, args.archive, args.parser, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            chunk_rows, chunk_failures = future.result()
+            rows.extend(chunk_rows)
+            failures.extend(chunk_failures)
+
+    if rows:
+        rows.sort(key=lambda row: row["url"])
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+            writer.writeheader()
+            writer.writerows(rows)
+
+    print(f"Done in {time.perf_counter() - start:.1f}s: {len(rows)} rows saved to {args.output}, "
+          f"{len(failures)} failed")
+    for url, error in failures[:10]:
+        print(f"  {url}: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import csv
+import json
+import sys
+
+APP_DIR = "app"
+sys.path.insert(0, APP_DIR)
+
+from catalog_terms import normalize_term
+
+CSV_PATHS = [
+    "data/appliance_parts_dishwasher.csv",
+    "data/appliance_parts_refrigerator.csv"
+]
+OUTPUT_PATH = "facet_index.json"
+
+
+def split_values(value, sep):
+    if not value or value.strip() in ("N/A", "NA"):
+        return []
+    return [normalize_term(v) for v in value.split(sep) if normalize_term(v)]
+
+
+def parse_rating(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def main():
+    parts = {}
+    for path in CSV_PATHS:
+        with open(path, mode="r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                pid = (row.get("part_id") or "").strip().lower()
+                if not pid or pid == "n/a" or pid in parts:
+                    continue
+                parts[pid] = {
+                    "rating": parse_rating(row.get("rating")),
+                    "symptom": split_values(row.get("symptoms"), "|"),
+                    "brand": split_values(row.get("brand"), "|"),
+                    "product_type": split_values(row.get("product_types"), ","),
+                }
+
+    # Rank by stored rating (scraper_page.py), ties broken by part id for stable output.
+    # The current CSVs carry no ratings, in which case the app only uses the index
+    # as a candidate filter and lets the vector store rank inside it.
+    ranked = sorted(parts, key=lambda pid: (-parts[pid]["rating"], pid))
+    rated = any(part["rating"] > 0 for part in parts.values())
+
+    facets = {"symptom": {}, "brand": {}, "product_type": {}}
+    for pid in ranked:
+        for facet, postings in facets.items():
+            for term in parts[pid][facet]:
+                postings.setdefault(term, []).append(pid)
+
+    index = {
+        "version": 1,
+        "rated": rated,
+        "ranked_parts": ranked,
+        "facets": facets,
+    }
+
+    with open(OUTPUT_PATH, "w") as f:
+        json.dump(index, f)
+
+    print(f"Saved {OUTPUT_PATH}: {len(ranked)} parts, "
+          + ", ".join(f"{len(postings)} {facet} terms" for facet, postings in facets.items()))
+    if not rated:
+        print("No ratings in the CSVs: facet matches will filter vector search instead of ranking")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import csv
+import json
+import re
+import sys
+
+APP_DIR = "app"
+sys.path.insert(0, APP_DIR)
+
+from catalog_terms import normalize_number
+
+CSV_PATHS = [
+    "data/appliance_parts_dishwasher.csv",
+    "data/appliance_parts_refrigerator.csv"
+]
+OUTPUT_PATH = "parts_graph.json"
+
+PS_IN_URL = re.compile(r"/(PS\d+)-", re.IGNORECASE)
+
+
+def manufacturer_number(row):
+    """Trailing token of the title, e.g. "... Right side DA97-11913L".
+
+    Manufacturer numbers can contain hyphens, so they can't be cut out of the URL
+    slug; the slug is only used to confirm the token really is the number.
+    """
+    tokens = (row.get("title") or "").split()
+    if not tokens:
+        return None
+    number = tokens[-1]
+    if f"-{number.lower()}-" not in (row.get("url") or "").lower():
+        return None
+    return number
+
+
+def split_values(value, sep):
+    if not value or value.strip() in ("N/A", "NA"):
+        return []
+    return [v.strip() for v in value.split(sep) if v.strip()]
+
+
+class Interner:
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def get(self, value):
+        if value not in self.ids:
+            self.ids[value] = len(self.values)
+            self.values.append(value)
+        return self.ids[value]
+
+
+def to_csr(adjacency, size):
+    offsets = [0]
+    targets = []
+    for node in range(size):
+        targets.extend(sorted(adjacency.get(node, ())))
+        offsets.append(len(targets))
+    return offsets, targets
+
+
+def resolve_superseded(nodes, aliases, replaces):
+    """A current part that lists another part's PS number in "replaces these" supersedes it."""
+    superseded_by = [-1] * len(nodes.values)
+    for node, alias_ids in replaces.items():
+        for alias_id in alias_ids:
+            old = nodes.ids.get(aliases.values[alias_id])
+            if old is not None and old != node:
+                superseded_by[old] = node
+
+    # Collapse chains so every entry points straight at the current part
+    for node in range(len(superseded_by)):
+        seen = {node}
+        target = superseded_by[node]
+        while target != -1 and superseded_by[target] != -1 and superseded_by[target] not in seen:
+            seen.add(target)
+            target = superseded_by[target]
+        superseded_by[node] = target
+    return superseded_by
+
+
+def main():
+    nodes = Interner()
+    aliases = Interner()
+    related = {}
+    replaces = {}
+    own_numbers = {}
+
+    for path in CSV_PATHS:
+        with open(path, mode="r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                pid = (row.get("part_id") or "").strip().lower()
+                if not pid or pid == "n/a":
+                    continue
+                node = nodes.get(pid)
+
+                # The part's own manufacturer number is an alias, not something it supersedes
+                mpn = manufacturer_number(row)
+                own = normalize_number(mpn) if mpn else None
+                if own and own != pid:
+                    own_numbers[node] = aliases.get(own)
+
+                for number in split_values(row.get("replacement_parts"), ","):
+                    key = normalize_number(number)
+                    if key and key not in (pid, own):
+                        replaces.setdefault(node, set()).add(aliases.get(key))
+
+                for entry in split_values(row.get("related_parts"), "|"):
+                    match = PS_IN_URL.search(entry)
+                    if match:
+                        target = nodes.get(match.group(1).lower())
+                        if target != node:
+                            related.setdefault(node, set()).add(target)
+
+    size = len(nodes.values)
+    related_offsets, related_targets = to_csr(related, size)
+    replaces_offsets, replaces_targets = to_csr(replaces, size)
+
+    graph = {
+        "version": 2,
+        "nodes": nodes.values,
+        "aliases": aliases.values,
+        "related_offsets": related_offsets,
+        "related_targets": related_targets,
+        "replaces_offsets": replaces_offsets,
+        "replaces_targets": replaces_targets,
+        "superseded_by": resolve_superseded(nodes, aliases, replaces),
+        "own_numbers": [own_numbers.get(node, -1) for node in range(size)],
+    }
+
+    with open(OUTPUT_PATH, "w") as f:
+        json.dump(graph, f)
+
+    print(f"Saved {OUTPUT_PATH}: {size} parts, {len(replaces_targets)} superseded numbers, "
+          f"{len(own_numbers)} manufacturer numbers, {len(related_targets)} related edges")
+
+
+if __name__ == "__main__":
+    main()
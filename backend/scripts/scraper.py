@@ -1,10 +1,15 @@
 import time
 import csv
+import os
 from playwright.sync_api import sync_playwright
+from html_archive import HtmlArchive
 
 BASE_URL = "https://www.partselect.com"
 PART_CATEGORY_URL = f"{BASE_URL}/Dishwasher-Parts.htm"
 
+# Set HTML_ARCHIVE_DIR to keep raw page HTML for offline re-extraction (scripts/reextract.py)
+ARCHIVE = HtmlArchive(os.environ["HTML_ARCHIVE_DIR"]) if os.getenv("HTML_ARCHIVE_DIR") else None
+
 def get_part_type_links(page):
     page.goto(PART_CATEGORY_URL, timeout=60000)
     page.wait_for_selector("#ShopByPartType", timeout=10000)
@@ -32,7 +37,12 @@ def extract_all_part_links(page, category_url):
 def extract_part_data(page, url):
     page.goto(url, timeout=60000)
     page.wait_for_selector("h1", timeout=10000)
+    if ARCHIVE:
+        ARCHIVE.put(url, page.content())
+    return parse_part_page(page, url)
 
+def parse_part_page(page, url):
+    # Selectors only; also run offline over archived HTML by scripts/reextract.py
     def safe_get(selector):
         try:
             content = page.locator(selector)